@@ -1,4 +1,5 @@
 from functools import wraps
+from string import Formatter
 import data_access as da
 from models import User
 import inspect
@@ -6,6 +7,13 @@ import inspect
 # Create a single instance of DataAccess
 data_access_instance = da.DataAccess()
 
+# Argument names that are universally useful as context in the log's 'details' field
+ID_KEYS = (
+    'user_id', 'traveller_id', 'scooter_id', 'profile_id', 'system_admin_id',
+    'username', 'first_name', 'last_name', 'email_address',
+    'backup_file', 'traveller_query', 'query'
+)
+
 
 def _get_user_from_args(*args, **kwargs):
     """Finds the User object from the function's arguments."""
@@ -20,42 +28,72 @@ def _get_user_from_args(*args, **kwargs):
     return None
 
 
-def _format_details(func, result, *args, **kwargs):
+def _compile_template(template):
+    """Returns a function that fills in the template from a dictionary of arguments."""
+    if not any(field_name for _, field_name, _, _ in Formatter().parse(template)):
+        return lambda context: template
+    return template.format_map
+
+
+class _CallBinder:
+    """
+    Everything about a function's signature that the audit wrapper needs, worked out once at decoration time,
+    so that naming the arguments of a call is a couple of dictionary operations instead of Signature.bind.
+    """
+
+    def __init__(self, func):
+        self.signature = inspect.signature(func)
+        parameters = list(self.signature.parameters.values())
+        # Functions with *args or **kwargs keep using Signature.bind; none of the audited functions have them.
+        self.is_simple = all(p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY) for p in parameters)
+        self.positional_names = tuple(p.name for p in parameters if p.kind == p.POSITIONAL_OR_KEYWORD)
+        self.defaults = {p.name: p.default for p in parameters if p.default is not p.empty}
+        self.user_name = 'current_user' if 'current_user' in self.signature.parameters else None
+        self.detail_names = tuple(p.name for p in parameters if p.name in ID_KEYS)
+
+    def arguments(self, args, kwargs):
+        """All arguments of a call by name, defaults included."""
+        if self.is_simple:
+            arguments = dict(self.defaults)
+            arguments.update(zip(self.positional_names, args))
+            arguments.update(kwargs)
+            return arguments
+        try:
+            bound_args = self.signature.bind(*args, **kwargs)
+            bound_args.apply_defaults()
+            return dict(bound_args.arguments)
+        except TypeError:
+            return dict(kwargs)
+
+    def user(self, arguments, args, kwargs):
+        if self.user_name is not None and isinstance(arguments.get(self.user_name), User):
+            return arguments[self.user_name]
+        return _get_user_from_args(*args, **kwargs)
+
+
+def _format_details(binder, is_add, arguments, result):
     """
     Creates a human-readable string from key function arguments for the log's 'details' field.
     """
     details = {}
-    try:
-        # Bind arguments to their names to easily access them
-        bound_args = inspect.signature(func).bind_partial(*args, **kwargs)
-        bound_args.apply_defaults()
-        arguments = bound_args.arguments
-    except TypeError:
-        # Fallback for cases where binding fails
-        arguments = kwargs
-
-    # Define keys that are universally useful for context
-    id_keys = [
-        'user_id', 'traveller_id', 'scooter_id', 'profile_id', 'system_admin_id',
-        'username', 'first_name', 'last_name', 'email_address',
-        'backup_file', 'traveller_query', 'query'
-    ]
 
     # Extract relevant details from the arguments
-    for key, value in arguments.items():
-        if key in id_keys and value:
-            # For 'data' dictionaries, extract specific fields
-            if isinstance(value, dict):
-                name = f"{value.get('first_name', '')} {value.get('last_name', '')}".strip()
-                if name:
-                    details['name'] = name
-                if value.get('email_address'):
-                    details['email'] = value.get('email_address')
-            else:
-                details[key] = value
+    for key in binder.detail_names:
+        value = arguments.get(key)
+        if not value:
+            continue
+        # For 'data' dictionaries, extract specific fields
+        if isinstance(value, dict):
+            name = f"{value.get('first_name', '')} {value.get('last_name', '')}".strip()
+            if name:
+                details['name'] = name
+            if value.get('email_address'):
+                details['email'] = value.get('email_address')
+        else:
+            details[key] = value
 
     # If the function result is a new ID, include it
-    if "ADD" in func.__name__.upper() and result and not isinstance(result, bool):
+    if is_add and result and not isinstance(result, bool):
         details['new_id'] = result
 
     # Format the dictionary into a clean string
@@ -65,9 +103,18 @@ def _format_details(func, result, *args, **kwargs):
 def audit_activity(event_type, success_desc, failure_desc, suspicious_on_fail=False):
     """
     A decorator that logs the execution of a function, creating a readable and structured log entry.
+    The function's signature and the description templates are analysed once, when the function is decorated.
     """
 
+    success_template = _compile_template(success_desc)
+    failure_template = _compile_template(failure_desc)
+    success_event = f"{event_type}_SUCCESS"
+    failure_event = f"{event_type}_FAIL"
+
     def decorator(func):
+        binder = _CallBinder(func)
+        is_add = "ADD" in func.__name__.upper()
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             # --- 1. Execute the actual function ---
@@ -75,42 +122,30 @@ def audit_activity(event_type, success_desc, failure_desc, suspicious_on_fail=Fa
 
             # --- 2. Determine Success and User ---
             is_success = result[0] if isinstance(result, tuple) else bool(result)
+            arguments = binder.arguments(args, kwargs)
 
-            username = "(unknown)"
-            user_obj = _get_user_from_args(*args, **kwargs)
+            user_obj = binder.user(arguments, args, kwargs)
             if user_obj:
                 username = user_obj.username
-            elif 'username' in kwargs:
-                username = kwargs['username']
+            else:
+                username = arguments.get('username', "(unknown)")
 
             # --- 3. Format Log Message ---
-            try:
-                # Use a dictionary of all args to format the description string
-                bound_args = inspect.signature(func).bind(*args, **kwargs)
-                bound_args.apply_defaults()
-                format_context = bound_args.arguments
-                format_context['result'] = result
-            except (TypeError, ValueError):
-                format_context = kwargs
-                format_context['result'] = result
-
-            log_description = success_desc.format(**format_context) if is_success else failure_desc.format(
-                **format_context)
-            additional_info = _format_details(func, result, *args, **kwargs)
+            additional_info = _format_details(binder, is_add, arguments, result)
+            arguments['result'] = result
+            log_description = success_template(arguments) if is_success else failure_template(arguments)
 
             # --- 4. Write to Log ---
-            is_suspicious_flag = 1 if (not is_success and suspicious_on_fail) else 0
-
             data_access_instance.add_log_entry(
                 username=username,
-                event_type=f"{event_type}_{'SUCCESS' if is_success else 'FAIL'}",
+                event_type=success_event if is_success else failure_event,
                 description=log_description,
                 additional_info=additional_info,
-                is_suspicious=is_suspicious_flag
+                is_suspicious=1 if (not is_success and suspicious_on_fail) else 0
             )
 
             return result
 
         return wrapper
 
-    return decorator
\ No newline at end of file
+    return decorator
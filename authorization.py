@@ -15,6 +15,8 @@ PERMISSIONS = {
         'add_scooter',
         'update_scooter_full',
         'delete_scooter',
+        'view_fleet_report',
+        'export_data',
         'add_service_engineer',
         'update_service_engineer_profile',
         'delete_service_engineer',
@@ -0,0 +1,237 @@
+import bz2
+import hashlib
+import json
+import lzma
+import os
+import shutil
+import sqlite3
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+import database
+from file_utils import write_file_atomically
+
+BACKUP_DIR = "backups"
+# Backups are incremental: the snapshot is cut into CHUNK_SIZE chunks, each stored once in CHUNK_DIR under the
+# SHA-256 of its content, and a backup is a manifest listing its chunks. Unchanged parts of the database are
+# shared with earlier backups, so a backup only stores what changed. Older backups are single zip files.
+CHUNK_DIR = os.path.join(BACKUP_DIR, "chunks")
+CHUNK_SIZE = 256 * 1024
+MANIFEST_SUFFIX = ".manifest"
+LEGACY_SUFFIX = ".zip"
+# Codec and level new chunks are compressed with (None is the codec's default level), and how many threads
+# compress them. zlib, lzma and bz2 release the GIL while compressing, so chunks compress in parallel.
+BACKUP_CODEC = 'deflate'
+BACKUP_LEVEL = None
+BACKUP_WORKERS = os.cpu_count() or 1
+
+# name -> (compress(data, level), decompress(data), default level, chunk file suffix)
+CODECS = {
+    'deflate': (lambda data, level: zlib.compress(data, level), zlib.decompress, 6, ''),
+    'lzma': (lambda data, level: lzma.compress(data, preset=level), lzma.decompress, 6, '.xz'),
+    'bz2': (lambda data, level: bz2.compress(data, level), bz2.decompress, 9, '.bz2')
+}
+# Levels each codec accepts: zlib takes 0-9 and -1 for its default, lzma presets 0-9, bz2 1-9.
+CODEC_LEVELS = {
+    'deflate': range(-1, 10),
+    'lzma': range(0, 10),
+    'bz2': range(1, 10)
+}
+
+# The snapshot copies this many database pages per step; progress() is updated after every step.
+BACKUP_PAGES_PER_STEP = 256
+
+
+def _chunk_path(digest, codec='deflate'):
+    return os.path.join(CHUNK_DIR, digest[:2], digest + CODECS[codec][3])
+
+
+def _find_chunk(digest):
+    """The codec and path of a stored chunk, whichever codec it was stored with, or None."""
+    for codec in CODECS:
+        path = _chunk_path(digest, codec)
+        if os.path.exists(path):
+            return codec, path
+    return None
+
+
+def check_codec(codec, level=None):
+    """Raises ValueError unless codec is known and level, if given, is one it accepts."""
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression '{codec}'; choose one of {', '.join(CODECS)}.")
+    levels = CODEC_LEVELS[codec]
+    if level is not None and (not isinstance(level, int) or isinstance(level, bool) or level not in levels):
+        raise ValueError(f"Compression level {level!r} is not valid for {codec}; "
+                         f"use {levels[0]} to {levels[-1]}.")
+
+
+def compress_chunk(data, codec, level=None):
+    compress, _, default_level, _ = CODECS[codec]
+    return compress(data, default_level if level is None else level)
+
+
+def _store_chunk(path, chunk, codec, level):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_file_atomically(path, compress_chunk(chunk, codec, level))
+
+
+def store_chunks(file_path, codec=None, level=None, workers=None):
+    """
+    Adds the chunks of a file to the chunk store, compressing the new ones on a pool of workers threads.
+    Chunks already stored, with any codec, are reused. Returns the digests of all of the file's chunks,
+    in order, and the number of chunks that were not stored yet.
+    """
+    codec = codec or BACKUP_CODEC
+    level = BACKUP_LEVEL if level is None else level
+    check_codec(codec, level)
+    workers = workers or BACKUP_WORKERS
+    digests = []
+    queued = set()
+    pending = set()
+    with open(file_path, 'rb') as f, ThreadPoolExecutor(max_workers=workers) as executor:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest = hashlib.sha256(chunk).hexdigest()
+            digests.append(digest)
+            if digest in queued or _find_chunk(digest) is not None:
+                continue
+            queued.add(digest)
+            # At most two chunks per worker are held in memory at a time.
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(executor.submit(_store_chunk, _chunk_path(digest, codec), chunk, codec, level))
+        for future in pending:
+            future.result()
+    return digests, len(queued)
+
+
+def write_manifest(manifest_path, digests, size, codec=None):
+    manifest = {
+        'format': 1,
+        'codec': codec or BACKUP_CODEC,
+        'database': os.path.basename(database.DATABASE_NAME),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'size': size,
+        'chunk_size': CHUNK_SIZE,
+        'chunks': digests
+    }
+    write_file_atomically(manifest_path, json.dumps(manifest, indent=1).encode('utf-8'))
+
+
+def restore_to(backup_path, target_path):
+    """
+    Writes the database saved in a backup, a manifest or a legacy zip, to target_path.
+    Manifest chunks are checked against their digests, so a damaged chunk store fails the restore.
+    """
+    if backup_path.endswith(LEGACY_SUFFIX):
+        with zipfile.ZipFile(backup_path, 'r') as zf, open(target_path, 'wb') as target:
+            with zf.open(os.path.basename(database.DATABASE_NAME)) as source:
+                shutil.copyfileobj(source, target)
+        return
+
+    with open(backup_path, 'rb') as f:
+        manifest = json.loads(f.read().decode('utf-8'))
+    with open(target_path, 'wb') as target:
+        for digest in manifest['chunks']:
+            found = _find_chunk(digest)
+            if found is None:
+                raise FileNotFoundError(f"Backup chunk {digest} is missing.")
+            codec, path = found
+            with open(path, 'rb') as f:
+                chunk = CODECS[codec][1](f.read())
+            if hashlib.sha256(chunk).hexdigest() != digest:
+                raise ValueError(f"Backup chunk {digest} is damaged.")
+            target.write(chunk)
+    if os.path.getsize(target_path) != manifest['size']:
+        raise ValueError("The restored database does not have the size recorded in the backup.")
+
+
+class BackupJob:
+    """
+    Creates a backup on a background thread: a consistent snapshot of the live database taken with the
+    SQLite backup API in steps of BACKUP_PAGES_PER_STEP pages, which is added to the chunk store once it is
+    complete, with a manifest in BACKUP_DIR. New chunks are compressed with codec at level, BACKUP_CODEC and
+    BACKUP_LEVEL by default; an unknown codec or a level it does not accept raises ValueError right away.
+
+    state is 'snapshot', 'storing', 'done' or 'failed'; progress() tells how far the snapshot is.
+    new_chunks and total_chunks tell how much of the database had changed since earlier backups.
+    """
+
+    def __init__(self, before_snapshot=None, codec=None, level=None):
+        self.before_snapshot = before_snapshot
+        self.codec = codec or BACKUP_CODEC
+        self.level = level
+        check_codec(self.codec, BACKUP_LEVEL if level is None else level)
+        self.state = 'snapshot'
+        self.pages_copied = 0
+        self.page_count = 0
+        self.backup_file = None
+        self.total_chunks = 0
+        self.new_chunks = 0
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name="database-backup")
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def is_running(self):
+        return self._thread.is_alive()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def progress(self):
+        """Fraction of the snapshot copied so far, between 0 and 1."""
+        if self.state in ('storing', 'done'):
+            return 1.0
+        return self.pages_copied / self.page_count if self.page_count else 0.0
+
+    def _on_step(self, status, remaining, total):
+        self.page_count = total
+        self.pages_copied = total - remaining
+
+    def _snapshot(self, snapshot_path):
+        source = database.connect_db()
+        if source is None:
+            raise ConnectionError("Failed to connect to the database.")
+        target = sqlite3.connect(snapshot_path)
+        try:
+            # An open read transaction pins the snapshot: in WAL mode a reader does not block writers, so they
+            # carry on during the whole copy, and since the source never sees their changes the backup does not
+            # have to restart from the first page. Checkpoints cannot pass the snapshot until the copy is done.
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            source.backup(target, pages=BACKUP_PAGES_PER_STEP, progress=self._on_step)
+        finally:
+            target.close()
+            source.close()
+
+    def _run(self):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        snapshot_path = os.path.join(BACKUP_DIR, f".snapshot_{timestamp}.db")
+        backup_path = os.path.join(BACKUP_DIR, f"backup_{timestamp}{MANIFEST_SUFFIX}")
+        try:
+            os.makedirs(BACKUP_DIR, exist_ok=True)
+            if self.before_snapshot is not None:
+                self.before_snapshot()
+            self._snapshot(snapshot_path)
+
+            self.state = 'storing'
+            digests, self.new_chunks = store_chunks(snapshot_path, self.codec, self.level)
+            self.total_chunks = len(digests)
+            write_manifest(backup_path, digests, os.path.getsize(snapshot_path), self.codec)
+            self.backup_file = backup_path
+            self.state = 'done'
+        except Exception as e:
+            self.error = e
+            self.state = 'failed'
+        finally:
+            for path in (snapshot_path, backup_path + ".tmp"):
+                if os.path.exists(path):
+                    os.remove(path)
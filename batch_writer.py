@@ -0,0 +1,107 @@
+import queue
+import threading
+import time
+
+_FLUSH = object()
+_STOP = object()
+
+
+class BatchWriter:
+    """
+    Queues items and hands them to write_batch in batches from a background thread.
+    A batch is written once it holds batch_size items, once flush_interval seconds passed since its first item,
+    or when flush() is called. The queue is bounded: submit() blocks while max_queue_size items are waiting.
+    on_exit is called from the background thread when it stops, e.g. to close a per-thread connection.
+    A batch whose write raises one of retry_on is written again up to max_retries times, waiting retry_delay
+    seconds before the first retry and twice as long before each next one; write_batch must be all or nothing.
+    """
+
+    def __init__(self, write_batch, max_queue_size=10000, batch_size=200, flush_interval=0.5, on_exit=None,
+                 name="batch-writer", retry_on=(), max_retries=5, retry_delay=0.5):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_exit = on_exit
+        self.retry_on = retry_on
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def submit(self, item):
+        self._ensure_started()
+        self._queue.put(item)
+
+    def flush(self):
+        """Blocks until every item submitted so far has been written."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        """Writes what is still queued and stops the background thread. submit() starts a new one."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join()
+
+    def _write(self, batch):
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.write_batch(batch)
+                return
+            except self.retry_on as e:
+                if attempt == self.max_retries:
+                    print(f"Giving up on a batch of {len(batch)} item(s) after {attempt + 1} attempts: {e}")
+                    return
+                time.sleep(delay)
+                delay *= 2
+            except Exception as e:
+                print(f"An error occurred while writing a batch of {len(batch)} item(s): {e}")
+                return
+
+    def _run(self):
+        stopping = False
+        try:
+            while not stopping:
+                item = self._queue.get()
+                taken = 1
+                batch = []
+                if item is _STOP:
+                    stopping = True
+                elif item is not _FLUSH:
+                    batch.append(item)
+                    deadline = time.monotonic() + self.flush_interval
+                    while len(batch) < self.batch_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = self._queue.get(timeout=remaining)
+                        except queue.Empty:
+                            break
+                        taken += 1
+                        if item is _FLUSH or item is _STOP:
+                            stopping = item is _STOP
+                            break
+                        batch.append(item)
+
+                if batch:
+                    self._write(batch)
+                for _ in range(taken):
+                    self._queue.task_done()
+        finally:
+            if self.on_exit is not None:
+                self.on_exit()
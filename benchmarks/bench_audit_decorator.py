@@ -0,0 +1,66 @@
+"""
+Per-call overhead of auditing.audit_activity compared with the undecorated function.
+
+Log entries go to a sink that drops them, so only the decorator itself is measured.
+Run from the repository root: python benchmarks/bench_audit_decorator.py [calls]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auditing
+from models import User
+
+
+class _NullSink:
+    def add_log_entry(self, **entry):
+        pass
+
+
+def update_scooter_details(scooter_obj, current_user, is_limited=False):
+    return True
+
+
+def add_new_traveller(data, current_user):
+    return "5f0c3a9e-0000-4000-8000-000000000000"
+
+
+def delete_traveller_record(traveller_id, current_user):
+    return False
+
+
+CASES = [
+    (update_scooter_details,
+     auditing.audit_activity("UPDATE_SCOOTER", "Successfully updated scooter", "Failed to update scooter"),
+     lambda user: ((object(), user), {})),
+    (add_new_traveller,
+     auditing.audit_activity("ADD_TRAVELLER", "Traveller {data[first_name]} added with ID {result}",
+                             "Failed to add traveller"),
+     lambda user: (({'first_name': 'Lotte', 'last_name': 'de Vries', 'email_address': 'l@x.com'},),
+                   {'current_user': user})),
+    (delete_traveller_record,
+     auditing.audit_activity("DELETE_TRAVELLER", "Deleted traveller {traveller_id}",
+                             "Failed to delete traveller {traveller_id}", suspicious_on_fail=True),
+     lambda user: (("5f0c3a9e",), {'current_user': user})),
+]
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    auditing.data_access_instance = _NullSink()
+    user = User(user_id="bench", username="bench_admin", role="superadmin")
+
+    print(f"{'function':<26} {'plain (us)':>11} {'audited (us)':>13} {'overhead (us)':>14}")
+    for func, decorator, make_call in CASES:
+        args, kwargs = make_call(user)
+        audited = decorator(func)
+        plain_time = min(timeit.repeat(lambda: func(*args, **kwargs), number=calls, repeat=3)) / calls
+        audited_time = min(timeit.repeat(lambda: audited(*args, **kwargs), number=calls, repeat=3)) / calls
+        print(f"{func.__name__:<26} {plain_time * 1e6:>11.3f} {audited_time * 1e6:>13.3f} "
+              f"{(audited_time - plain_time) * 1e6:>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Compression ratio and speed of the backup codecs on a database file, with one thread and with the thread pool
+the backup uses, so BACKUP_CODEC and BACKUP_LEVEL can be chosen for the data at hand.
+
+Only compression is measured; nothing is written to the chunk store.
+Run from the repository root: python benchmarks/bench_backup_codecs.py [database file] [workers]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backup
+import database
+
+LEVELS = {
+    'deflate': (1, 6, 9),
+    'lzma': (0, 6),
+    'bz2': (1, 9)
+}
+
+
+def read_chunks(path):
+    with open(path, 'rb') as f:
+        return list(iter(lambda: f.read(backup.CHUNK_SIZE), b''))
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else database.DATABASE_NAME
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else backup.BACKUP_WORKERS
+    chunks = read_chunks(path)
+    size = sum(len(chunk) for chunk in chunks)
+    print(f"{path}: {size / 1e6:.1f} MB in {len(chunks)} chunks, {workers} workers")
+
+    print(f"{'codec':<8} {'level':>5} {'ratio':>7} {'1 thread (s)':>13} {'pool (s)':>9} {'pool MB/s':>10}")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for codec, levels in LEVELS.items():
+            for level in levels:
+                start = time.perf_counter()
+                compressed = sum(len(backup.compress_chunk(chunk, codec, level)) for chunk in chunks)
+                single_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                list(executor.map(lambda chunk: backup.compress_chunk(chunk, codec, level), chunks))
+                pool_time = time.perf_counter() - start
+
+                print(f"{codec:<8} {level:>5} {size / compressed:>7.2f} {single_time:>13.2f} {pool_time:>9.2f} "
+                      f"{size / 1e6 / pool_time:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by a number of entries and/or an estimate of the bytes it holds.
+    Either limit can be None to leave it unbounded.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def estimate_size(value):
+        if isinstance(value, dict):
+            return sum(len(str(key)) + len(str(item)) for key, item in value.items() if item is not None)
+        return len(str(value))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key, value):
+        self.pop(key)
+        size = self.estimate_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.current_bytes += size
+        self._evict()
+
+    def pop(self, key):
+        if key not in self._entries:
+            return None
+        self.current_bytes -= self._sizes.pop(key)
+        return self._entries.pop(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._sizes.clear()
+        self.current_bytes = 0
+
+    def _evict(self):
+        while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries) or
+                (self.max_bytes is not None and self.current_bytes > self.max_bytes)):
+            oldest_key = next(iter(self._entries))
+            self.pop(oldest_key)
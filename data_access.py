@@ -1,10 +1,148 @@
 import sqlite3
+import atexit
+import json
+import threading
 from contextlib import contextmanager
+from datetime import date
 import database
 import uuid
+from caching import LRUCache
+from batch_writer import BatchWriter
+from log_store import LogStore
+from indexes import NGramIndex, PrefixIndex, GridIndex
+from telemetry_store import ScooterTelemetry
+import log_archive
+import fleet_report
 from models import Traveller, Scooter, UserProfile, RestoreCode
 from security import SecurityManager
 
+# Primary key of every in-memory table, used to insert, replace and remove single records.
+TABLE_KEYS = {
+    'users': 'user_id',
+    'user_profiles': 'profile_id',
+    'travellers': 'customer_id',
+    'scooters': 'scooter_id',
+    'restore_codes': 'code_id',
+    'logs': 'log_id'
+}
+
+# Secondary hash indexes kept next to the in-memory tables: name -> (table, indexed field, unique).
+# Primary key lookups go straight to the tables, which are already keyed dictionaries.
+INDEXES = {
+    'users_by_username': ('users', 'username', True),
+    'users_by_role': ('users', 'role', False),
+    'profiles_by_user_id': ('user_profiles', 'user_id', True),
+    'restore_codes_by_code': ('restore_codes', 'restore_code', True),
+    'restore_codes_by_admin': ('restore_codes', 'system_admin_id', False),
+    'travellers_by_email': ('travellers', 'email_address', True),
+    'travellers_by_license': ('travellers', 'driving_license_number', False),
+    'travellers_by_phone': ('travellers', 'mobile_phone', False),
+    'scooters_by_serial': ('scooters', 'serial_number', True)
+}
+# Indexes keyed like the blind indexes they stand in for when a table is loaded: stripped and lowercased.
+NORMALIZED_INDEXES = {'travellers_by_email', 'travellers_by_license', 'travellers_by_phone', 'scooters_by_serial'}
+
+# Text search indexes kept next to the in-memory tables: name -> (table, indexed fields, index type).
+# NGramIndex serves substring search, PrefixIndex prefix search.
+TEXT_INDEXES = {
+    'travellers_text': ('travellers', ('first_name', 'last_name', 'customer_id'), NGramIndex),
+    'scooters_text': ('scooters', ('brand', 'model', 'serial_number'), NGramIndex),
+    'scooters_prefix': ('scooters', ('brand', 'model', 'serial_number'), PrefixIndex)
+}
+
+# Grid indexes over record positions: name -> (table, latitude field, longitude field).
+SPATIAL_INDEXES = {
+    'scooters_location': ('scooters', 'location_latitude', 'location_longitude')
+}
+
+# Database table behind every in-memory table, and the columns in it that are stored unencrypted.
+TABLE_SOURCES = {
+    'users': ('Users', ('user_id',)),
+    'user_profiles': ('UserProfiles', ('profile_id', 'user_id')),
+    'travellers': ('Travellers', ('customer_id', 'registration_date')),
+    'scooters': ('Scooters', ('scooter_id',)),
+    'restore_codes': ('RestoreCodes', ('code_id', 'system_admin_id')),
+    'logs': ('Logs', ('log_id', 'is_suspicious'))
+}
+
+# Columns that older versions used and that are no longer loaded into memory.
+UNLOADED_COLUMNS = {
+    'logs': ('is_read',)
+}
+
+# Log read state is one watermark shared by everyone who can view the logs, stored under this id.
+LOG_READ_MARK_ID = 'system_logs'
+
+# Container type of the in-memory tables that need more than a plain dict.
+TABLE_CONTAINERS = {
+    'logs': LogStore
+}
+
+# Blind index columns are lookup helpers only; they never appear in the in-memory records.
+BLIND_INDEX_COLUMNS = {column for columns in database.BLIND_INDEXES.values() for column in columns}
+
+# Encrypted columns that are written on both insert and update, in table column order.
+TRAVELLER_FIELDS = ('first_name', 'last_name', 'birthday', 'gender', 'street_name', 'house_number', 'zip_code',
+                    'city', 'email_address', 'mobile_phone', 'driving_license_number')
+SCOOTER_FIELDS = ('brand', 'model', 'serial_number', 'top_speed_kmh', 'battery_capacity_wh', 'soc_percentage',
+                  'target_soc_min', 'target_soc_max', 'location_latitude', 'location_longitude', 'out_of_service',
+                  'mileage_km', 'last_maintenance_date')
+
+# Decrypt-on-demand mode: for these tables only the listed search fields (and unencrypted columns) are kept
+# decrypted in memory. The other fields stay ciphertext until a full record is needed, and decrypted full
+# records are kept in a bounded LRU cache per table.
+DECRYPT_ON_DEMAND = False
+ON_DEMAND_RESIDENT_FIELDS = {
+    'travellers': ('first_name', 'last_name', 'driving_license_number')
+}
+FIELD_CACHE_MAX_ENTRIES = 1000
+FIELD_CACHE_MAX_BYTES = 1024 * 1024
+
+# Log entries are written to the database in batches from a background thread. A batch is written once it
+# holds AUDIT_BATCH_SIZE entries or AUDIT_FLUSH_INTERVAL seconds after its first entry; add_log_entry blocks
+# while AUDIT_QUEUE_SIZE entries are waiting. With AUDIT_ASYNC off every entry is written before returning.
+AUDIT_ASYNC = True
+AUDIT_QUEUE_SIZE = 10000
+AUDIT_BATCH_SIZE = 200
+AUDIT_FLUSH_INTERVAL = 0.5
+# A batch that fails with an OperationalError, such as a database still locked after busy_timeout, is written
+# again up to AUDIT_WRITE_RETRIES times, AUDIT_RETRY_DELAY seconds after the first failure, doubling each time.
+AUDIT_WRITE_RETRIES = 5
+AUDIT_RETRY_DELAY = 0.5
+
+# Logs older than LOG_RETENTION_DAYS that have been read are moved out of the Logs table into archive
+# segments of at most LOG_ARCHIVE_SEGMENT_SIZE entries, see archive_old_logs.
+LOG_RETENTION_DAYS = 90
+LOG_ARCHIVE_SEGMENT_SIZE = 10000
+
+# Rows fetched and decrypted at a time by stream_records.
+EXPORT_CHUNK_SIZE = 2000
+
+# Every stored field of the tables that support row-level ("sealed") storage, see database.RECORD_STORAGE_MODE.
+RECORD_FIELDS = {
+    'travellers': TRAVELLER_FIELDS + ('registration_date',),
+    'scooters': SCOOTER_FIELDS + ('in_service_date',)
+}
+
+
+class _LazyTables(dict):
+    """In-memory tables keyed by name. A table is loaded and decrypted the first time it is read."""
+
+    def __init__(self, loader):
+        super().__init__()
+        self._loader = loader
+
+    def __missing__(self, table):
+        if table not in TABLE_KEYS:
+            raise KeyError(table)
+        self[table] = TABLE_CONTAINERS.get(table, dict)()
+        try:
+            self._loader(table)
+        except Exception:
+            del self[table]
+            raise
+        return self[table]
+
 
 class DataAccess:
     _instance = None
@@ -21,24 +159,52 @@ class DataAccess:
 
         self.security = SecurityManager()
 
-        self.in_memory_data = {
-            'users': [],
-            'user_profiles': [],
-            'travellers': [],
-            'scooters': [],
-            'restore_codes': [],
-            'logs': []
-        }
-
-        self.load_all_data_to_memory()
+        # One long-lived connection per thread, closed again at application exit.
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        atexit.register(self.close_connections)
+        atexit.register(self.security.shutdown_workers)
+
+        self.audit_writer = BatchWriter(self._write_log_entries, AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE,
+                                        AUDIT_FLUSH_INTERVAL, on_exit=self.release_connection, name="audit-writer",
+                                        retry_on=(sqlite3.OperationalError,), max_retries=AUDIT_WRITE_RETRIES,
+                                        retry_delay=AUDIT_RETRY_DELAY)
+        # Registered last so it runs first at exit, while the connections and crypto workers are still there.
+        atexit.register(self.audit_writer.close)
+
+        # Storage layout per table, detected from the schema on first use.
+        self._sealed_tables = {}
+
+        self.field_caches = {table: LRUCache(FIELD_CACHE_MAX_ENTRIES, FIELD_CACHE_MAX_BYTES)
+                             for table in ON_DEMAND_RESIDENT_FIELDS}
+
+        # Tables are decrypted the first time they are read, not at startup.
+        self.in_memory_data = _LazyTables(self._load_table)
+        self.indexes = {name: {} for name in INDEXES}
+        self.text_indexes = {name: index_type() for name, (_, _, index_type) in TEXT_INDEXES.items()}
+        self.spatial_indexes = {name: GridIndex() for name in SPATIAL_INDEXES}
+        # Typed numeric columns of the Scooters table, for vectorized fleet-wide filters.
+        self.scooter_telemetry = ScooterTelemetry()
+        self._fleet_report = None
 
         DataAccess._initialized = True
 
+    def _get_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = database.connect_db()
+            if conn is None:
+                raise ConnectionError("Failed to connect to the database.")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
     @contextmanager
     def db_connection(self):
-        conn = database.connect_db()
-        if conn is None:
-            raise ConnectionError("Failed to connect to the database.")
+        conn = self._get_connection()
+        conn.row_factory = None
         try:
             yield conn
             conn.commit()
@@ -46,9 +212,40 @@ class DataAccess:
             print(f"Database error: {e}")
             conn.rollback()
             raise
-        finally:
-            if conn:
+        except Exception:
+            conn.rollback()
+            raise
+
+    def checkpoint(self):
+        """Writes queued log entries, then copies everything from the write-ahead log into the main database file."""
+        self.flush_audit_log()
+        with self.db_connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+
+    def release_connection(self):
+        """Closes the calling thread's pooled connection, if it has one."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._connections_lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    def close_connections(self):
+        """Closes every pooled connection. They are reopened on demand when the database is used again."""
+        # The audit writer thread owns its connection; stopping it writes the queue and closes that connection.
+        self.audit_writer.close()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
                 conn.close()
+            except sqlite3.Error as e:
+                print(f"Error closing database connection: {e}")
+        self._local = threading.local()
+        self._sealed_tables = {}
 
     def encrypt_value(self, value):
         if value is None:
@@ -60,75 +257,465 @@ class DataAccess:
     def decrypt_value(self, value):
         if value is None:
             return None
+        if not isinstance(value, bytes):
+            # A few columns (registration dates, a deactivated is_active flag) are stored unencrypted.
+            return str(value)
         decrypted = self.security.decrypt_data(value)
         if decrypted is None:
             return None
         return decrypted
 
-    def load_all_data_to_memory(self):
-        self.in_memory_data = {
-            'users': [],
-            'user_profiles': [],
-            'travellers': [],
-            'scooters': [],
-            'restore_codes': [],
-            'logs': []
-        }
+    @staticmethod
+    def _index_key(index_name, value):
+        return str(value).strip().lower() if index_name in NORMALIZED_INDEXES else value
+
+    def _index_record(self, table, record):
+        for name, (index_table, field, unique) in INDEXES.items():
+            if index_table != table or record.get(field) is None:
+                continue
+            value = self._index_key(name, record[field])
+            if unique:
+                self.indexes[name][value] = record
+            else:
+                self.indexes[name].setdefault(value, {})[record[TABLE_KEYS[table]]] = record
+        for name, (index_table, fields, _) in TEXT_INDEXES.items():
+            if index_table == table:
+                self.text_indexes[name].add(record[TABLE_KEYS[table]], [record.get(field) for field in fields])
+        for name, (index_table, latitude_field, longitude_field) in SPATIAL_INDEXES.items():
+            if index_table != table:
+                continue
+            try:
+                latitude, longitude = float(record[latitude_field]), float(record[longitude_field])
+            except (KeyError, TypeError, ValueError):
+                continue
+            self.spatial_indexes[name].add(record[TABLE_KEYS[table]], latitude, longitude)
+        if table == 'scooters':
+            self.scooter_telemetry.add(record['scooter_id'], record)
+
+    def _unindex_record(self, table, record, removed=False):
+        for name, (index_table, field, unique) in INDEXES.items():
+            value = record.get(field)
+            if index_table != table or value is None:
+                continue
+            value = self._index_key(name, value)
+            if unique:
+                if self.indexes[name].get(value) is record:
+                    del self.indexes[name][value]
+            else:
+                bucket = self.indexes[name].get(value, {})
+                bucket.pop(record[TABLE_KEYS[table]], None)
+                if not bucket:
+                    self.indexes[name].pop(value, None)
+        for name, (index_table, fields, _) in TEXT_INDEXES.items():
+            if index_table == table:
+                self.text_indexes[name].remove(record[TABLE_KEYS[table]], [record.get(field) for field in fields],
+                                               forget=removed)
+        for name, (index_table, _, _) in SPATIAL_INDEXES.items():
+            if index_table == table:
+                self.spatial_indexes[name].remove(record[TABLE_KEYS[table]])
+        # An updated record is written over its row when it is indexed again.
+        if table == 'scooters' and removed:
+            self.scooter_telemetry.remove(record['scooter_id'])
+
+    # The write helpers leave tables that are not loaded alone; those are read fresh from the database later.
+    def _cache_put(self, table, record):
+        if not self.is_table_loaded(table):
+            return
+        key = record[TABLE_KEYS[table]]
+        existing = self.in_memory_data[table].get(key)
+        if existing is not None:
+            self._unindex_record(table, existing)
+        self.in_memory_data[table][key] = record
+        self._index_record(table, record)
+
+    def _cache_update(self, table, key, **fields):
+        if not self.is_table_loaded(table):
+            return None
+        record = self.in_memory_data[table].get(key)
+        if record is not None:
+            self._unindex_record(table, record)
+            record.update(fields)
+            self._index_record(table, record)
+        return record
+
+    def _cache_remove(self, table, key):
+        if not self.is_table_loaded(table):
+            return None
+        record = self.in_memory_data[table].pop(key, None)
+        if record is not None:
+            self._unindex_record(table, record, removed=True)
+        return record
+
+    def _lookup(self, index_name, value):
+        _ = self.in_memory_data[INDEXES[index_name][0]]
+        return self.indexes[index_name].get(self._index_key(index_name, value))
+
+    def _lookup_all(self, index_name, value):
+        _ = self.in_memory_data[INDEXES[index_name][0]]
+        return list(self.indexes[index_name].get(self._index_key(index_name, value), {}).values())
+
+    @staticmethod
+    def _stored_text(value):
+        # Mirrors encrypt_value so cached values look exactly like freshly decrypted ones.
+        if value is None:
+            return None
+        return str(value) or None
+
+    def _is_sealed(self, source_table):
+        if source_table not in self._sealed_tables:
+            with self.db_connection() as conn:
+                self._sealed_tables[source_table] = 'sealed_record' in database.get_table_columns(conn, source_table)
+        return self._sealed_tables[source_table]
+
+    def _seal_record(self, table, record):
+        fields = {field: record[field] for field in RECORD_FIELDS[table]}
+        return self.encrypt_value(json.dumps(fields, separators=(',', ':')))
+
+    def _unseal_record(self, table, primary_key_value, sealed):
+        record = {TABLE_KEYS[table]: primary_key_value, **dict.fromkeys(RECORD_FIELDS[table])}
+        if sealed is not None:
+            record.update(json.loads(sealed))
+        return record
+
+    def _encode_record(self, table, record, fields):
+        """Maps the given fields of a record to their stored column values, in the table's storage layout."""
+        source_table, plain_columns = TABLE_SOURCES[table]
+        if self._is_sealed(source_table):
+            values = {'sealed_record': self._seal_record(table, record)}
+        else:
+            values = {field: record[field] if field in plain_columns else self.encrypt_value(record[field])
+                      for field in fields}
+        if source_table in database.BLIND_INDEXES:
+            values.update(zip(database.BLIND_INDEXES[source_table], self._blind_index_params(source_table, record)))
+        return values
+
+    def _encode_records(self, table, records):
+        """_encode_record for every field of many records, with all of their encryption done in one encrypt_many call."""
+        source_table, plain_columns = TABLE_SOURCES[table]
+        if self._is_sealed(source_table):
+            ciphertexts = self.security.encrypt_many(
+                [json.dumps({field: record[field] for field in RECORD_FIELDS[table]}, separators=(',', ':'))
+                 for record in records])
+            encoded = [{'sealed_record': ciphertext} for ciphertext in ciphertexts]
+        else:
+            fields = RECORD_FIELDS[table]
+            ciphertexts = iter(self.security.encrypt_many(
+                [str(record[field]) for record in records for field in fields
+                 if field not in plain_columns and record[field] is not None]))
+            encoded = [{field: record[field] if field in plain_columns or record[field] is None else next(ciphertexts)
+                        for field in fields} for record in records]
+        if source_table in database.BLIND_INDEXES:
+            for record, values in zip(records, encoded):
+                values.update(zip(database.BLIND_INDEXES[source_table], self._blind_index_params(source_table, record)))
+        return encoded
+
+    # Both return the stored column values, or None when no row was updated.
+    def _insert_record(self, conn, table, record):
+        primary_key = TABLE_KEYS[table]
+        values = self._encode_record(table, record, RECORD_FIELDS[table])
+        columns = [primary_key, *values]
+        sql = f"INSERT INTO {TABLE_SOURCES[table][0]}({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        conn.execute(sql, (record[primary_key], *values.values()))
+        return values
+
+    def _update_record(self, conn, table, record, fields):
+        primary_key = TABLE_KEYS[table]
+        values = self._encode_record(table, record, fields)
+        assignments = ', '.join(f"{column} = ?" for column in values)
+        sql = f"UPDATE {TABLE_SOURCES[table][0]} SET {assignments} WHERE {primary_key} = ?"
+        if conn.execute(sql, (*values.values(), record[primary_key])).rowcount > 0:
+            return values
+        return None
+
+    def _is_on_demand(self, table):
+        return DECRYPT_ON_DEMAND and table in ON_DEMAND_RESIDENT_FIELDS
+
+    def _resident_record(self, table, record, stored_values):
+        """
+        The form a freshly written record takes in memory. In decrypt-on-demand mode that is the search
+        fields plus the ciphertext just written; the full plaintext goes into the field cache instead.
+        """
+        if not self._is_on_demand(table):
+            return record
+        resident_fields = (TABLE_KEYS[table], *ON_DEMAND_RESIDENT_FIELDS[table], *TABLE_SOURCES[table][1])
+        resident = {key: value for key, value in record.items() if key in resident_fields}
+        resident['_encrypted'] = {column: value for column, value in stored_values.items()
+                                  if column not in BLIND_INDEX_COLUMNS and column not in resident_fields}
+        self.field_caches[table].put(record[TABLE_KEYS[table]], dict(record))
+        return resident
+
+    def _full_record(self, table, record):
+        """Returns the fully decrypted form of an in-memory record, decrypting on demand through the field cache."""
+        if '_encrypted' not in record:
+            return record
+        primary_key = record[TABLE_KEYS[table]]
+        cached = self.field_caches[table].get(primary_key)
+        if cached is not None:
+            return cached
+
+        encrypted = record['_encrypted']
+        full = {key: value for key, value in record.items() if key != '_encrypted'}
+        decrypted = dict(zip(encrypted, self.security.decrypt_many(list(encrypted.values()))))
+        if 'sealed_record' in decrypted:
+            full = self._unseal_record(table, primary_key, decrypted['sealed_record'])
+        else:
+            full.update(decrypted)
+        self.field_caches[table].put(primary_key, full)
+        return full
+
+    def _decrypt_rows(self, table, rows, resident_fields=None):
+        """
+        Decrypts database rows into in-memory records, sending all ciphertexts through one batch call.
+        With resident_fields, only those fields are decrypted and the rest is kept as ciphertext under '_encrypted'.
+        """
+        plain_columns = TABLE_SOURCES[table][1]
+        unloaded_columns = UNLOADED_COLUMNS.get(table, ())
+        records = []
+        pending_cells = []
+        pending_tokens = []
+        for row in rows:
+            record = {}
+            for key in row.keys():
+                value = row[key]
+                if key in BLIND_INDEX_COLUMNS or key in unloaded_columns:
+                    continue
+                if key in plain_columns:
+                    record[key] = value
+                elif resident_fields is not None and key not in resident_fields and key != 'sealed_record':
+                    record.setdefault('_encrypted', {})[key] = value
+                elif isinstance(value, bytes):
+                    pending_cells.append((record, key))
+                    pending_tokens.append(value)
+                else:
+                    record[key] = self.decrypt_value(value)
+            records.append(record)
+
+        for (record, key), value in zip(pending_cells, self.security.decrypt_many(pending_tokens)):
+            record[key] = value
+
+        primary_key = TABLE_KEYS[table]
+        for index, (record, row) in enumerate(zip(records, rows)):
+            if 'sealed_record' not in record:
+                continue
+            unsealed = self._unseal_record(table, record[primary_key], record['sealed_record'])
+            if resident_fields is not None:
+                # A sealed record has to be decrypted as a whole; only the resident fields are kept.
+                unsealed = {key: value for key, value in unsealed.items()
+                            if key == primary_key or key in resident_fields or key in plain_columns}
+                unsealed['_encrypted'] = {'sealed_record': row['sealed_record']}
+            records[index] = unsealed
+        return records
+
+    def stream_records(self, table, fields=None, chunk_size=EXPORT_CHUNK_SIZE):
+        """
+        Yields the records of a travellers or scooters table straight from the database, in lists of chunk_size,
+        without loading the table into memory. Records hold the primary key and the given fields (all by default).
+        Only the selected columns are read and decrypted, except in row-level storage where every row is one token.
+        """
+        primary_key = TABLE_KEYS[table]
+        fields = (primary_key, *(fields or RECORD_FIELDS[table]))
+        source_table = TABLE_SOURCES[table][0]
+        columns = (primary_key, 'sealed_record') if self._is_sealed(source_table) else fields
+        # A connection of its own, so the open read does not hold up writes made while the records are consumed.
+        conn = database.connect_db()
+        if conn is None:
+            raise ConnectionError("Failed to connect to the database.")
+        try:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {source_table} ORDER BY rowid")
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [{field: record.get(field) for field in fields} for record in self._decrypt_rows(table, rows)]
+        finally:
+            conn.close()
 
+    def _decrypt_row(self, table, row):
+        return self._decrypt_rows(table, [row])[0]
+
+    def _load_table(self, table):
+        if table == 'logs':
+            self.flush_audit_log()
+        source_table = TABLE_SOURCES[table][0]
         with self.db_connection() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
+            cursor.execute(f"SELECT * FROM {source_table}")
+            rows = cursor.fetchall()
+        resident_fields = ON_DEMAND_RESIDENT_FIELDS[table] if self._is_on_demand(table) else None
+        for record in self._decrypt_rows(table, rows, resident_fields):
+            self._cache_put(table, record)
+        if table == 'logs':
+            self.in_memory_data['logs'].set_read_mark(self._load_log_read_mark())
+
+    def _load_log_read_mark(self):
+        with self.db_connection() as conn:
+            row = conn.execute("SELECT last_read_timestamp, last_read_log_id FROM LogReadMarks WHERE mark_id = ?",
+                               (LOG_READ_MARK_ID,)).fetchone()
+            if row is not None:
+                return self.decrypt_value(row[0]), row[1]
+
+            # Databases from before the watermark: the newest log flagged as read becomes the mark.
+            rows = conn.execute("SELECT log_id, timestamp FROM Logs WHERE is_read = 1").fetchall()
+        if not rows:
+            return None
+        timestamps = self.security.decrypt_many([timestamp for _, timestamp in rows])
+        read_mark = max(zip(timestamps, (log_id for log_id, _ in rows)))
+        self._save_log_read_mark(read_mark)
+        return read_mark
+
+    def _save_log_read_mark(self, read_mark):
+        timestamp, log_id = read_mark
+        with self.db_connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO LogReadMarks (mark_id, last_read_timestamp, last_read_log_id) "
+                         "VALUES (?, ?, ?)", (LOG_READ_MARK_ID, self.encrypt_value(timestamp), log_id))
 
-            cursor.execute("SELECT * FROM Users")
-            for row in cursor.fetchall():
-                user_data = dict(row)
-                user_data['username'] = self.decrypt_value(user_data['username'])
-                user_data['password_hash'] = self.decrypt_value(user_data['password_hash'])
-                user_data['role'] = self.decrypt_value(user_data['role'])
-                user_data['is_active'] = self.decrypt_value(user_data['is_active'])
-                self.in_memory_data['users'].append(user_data)
-
-            cursor.execute("SELECT * FROM UserProfiles")
-            for row in cursor.fetchall():
-                profile_data = dict(row)
-                profile_data['first_name'] = self.decrypt_value(profile_data['first_name'])
-                profile_data['last_name'] = self.decrypt_value(profile_data['last_name'])
-                profile_data['registration_date'] = self.decrypt_value(profile_data['registration_date'])
-                self.in_memory_data['user_profiles'].append(profile_data)
-
-            cursor.execute("SELECT * FROM Travellers")
-            for row in cursor.fetchall():
-                traveller_data = dict(row)
-                for key in traveller_data:
-                    if key not in ['customer_id']:
-                        traveller_data[key] = self.decrypt_value(traveller_data[key])
-
-
-                self.in_memory_data['travellers'].append(traveller_data)
-
-            cursor.execute("SELECT * FROM Scooters")
-            for row in cursor.fetchall():
-                scooter_data = dict(row)
-                for key in scooter_data:
-                    if key != 'scooter_id':
-                        scooter_data[key] = self.decrypt_value(scooter_data[key])
-                self.in_memory_data['scooters'].append(scooter_data)
-
-            cursor.execute("SELECT * FROM RestoreCodes")
-            for row in cursor.fetchall():
-                code_data = dict(row)
-                for key in code_data:
-                    if key not in ['code_id', 'system_admin_id']:
-                        code_data[key] = self.decrypt_value(code_data[key])
-                self.in_memory_data['restore_codes'].append(code_data)
-
-            cursor.execute("SELECT * FROM Logs")
-            for row in cursor.fetchall():
-                log_data = dict(row)
-                for key in log_data:
-                    if key not in ['log_id', 'is_suspicious', 'is_read']:
-                        log_data[key] = self.decrypt_value(log_data[key])
-                self.in_memory_data['logs'].append(log_data)
+    def _blind_index(self, value):
+        if not database.BLIND_INDEXES_ENABLED or value is None:
+            return None
+        return self.security.blind_index(str(value))
+
+    def _blind_index_params(self, source_table, record):
+        return tuple(self._blind_index(record[source_column])
+                     for source_column, _ in database.BLIND_INDEXES[source_table].values())
+
+    def _find_by_blind_index(self, table, column, value):
+        """Fetches and decrypts only the rows whose blind index matches, without touching the rest of the table."""
+        blind_index = self._blind_index(value)
+        if blind_index is None:
+            return []
+        with self.db_connection() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(f"SELECT * FROM {TABLE_SOURCES[table][0]} WHERE {column} = ?",
+                                (blind_index,)).fetchall()
+        return self._decrypt_rows(table, rows)
+
+    def _find_records(self, table, column, value):
+        # Loaded tables are searched through their hash index; otherwise the blind index finds the rows in SQL.
+        source_table = TABLE_SOURCES[table][0]
+        source_column = database.BLIND_INDEXES[source_table][column][0]
+        index_name, unique = next((name, unique) for name, (index_table, field, unique) in INDEXES.items()
+                                  if index_table == table and field == source_column)
+        in_memory = self.is_table_loaded(table) and not self._is_on_demand(table)
+        if in_memory or (not database.BLIND_INDEXES_ENABLED and not self._is_on_demand(table)):
+            if unique:
+                record = self._lookup(index_name, value)
+                return [record] if record is not None else []
+            return self._lookup_all(index_name, value)
+        if not database.BLIND_INDEXES_ENABLED:
+            # On-demand records do not keep every field resident, so the index may not hold them all.
+            normalized = str(value).strip().lower()
+            records = (self._full_record(table, record) for record in self.in_memory_data[table].values())
+            return [record for record in records
+                    if record[source_column] and record[source_column].strip().lower() == normalized]
+        return self._find_by_blind_index(table, column, value)
+
+    def backfill_blind_indexes(self):
+        """Fills blind index columns for rows written before they existed. Safe to run on every startup."""
+        if not database.BLIND_INDEXES_ENABLED:
+            return 0
+        filled = 0
+        with self.db_connection() as conn:
+            database.add_blind_index_columns(conn)
+            for source_table, columns in database.BLIND_INDEXES.items():
+                primary_key = next(key for table, key in TABLE_KEYS.items()
+                                   if TABLE_SOURCES[table][0] == source_table)
+                table_columns = database.get_table_columns(conn, source_table)
+                for column, (source_column, _) in columns.items():
+                    if source_column not in table_columns:
+                        # Sealed tables get their blind indexes when they are converted.
+                        continue
+                    rows = conn.execute(f"SELECT {primary_key}, {source_column} FROM {source_table} "
+                                        f"WHERE {column} IS NULL AND {source_column} IS NOT NULL").fetchall()
+                    for key, encrypted_value in rows:
+                        try:
+                            conn.execute(f"UPDATE {source_table} SET {column} = ? WHERE {primary_key} = ?",
+                                         (self._blind_index(self.decrypt_value(encrypted_value)), key))
+                            filled += 1
+                        except sqlite3.IntegrityError:
+                            print(f"Warning: duplicate {source_column} in {source_table} row {key}; "
+                                  f"it was left out of the unique blind index.")
+        if filled:
+            print(f"Backfilled {filled} blind index value(s).")
+        return filled
+
+    def convert_record_storage(self, mode, chunk_size=500):
+        """
+        Rebuilds the Travellers and Scooters tables in the given storage layout ('column' or 'row'),
+        re-encrypting every record. Tables that already use that layout are left alone.
+        """
+        sealed = mode == 'row'
+        for table in RECORD_FIELDS:
+            source_table = TABLE_SOURCES[table][0]
+            if self._is_sealed(source_table) == sealed:
+                continue
+            old_table = f"{source_table}_old"
+            converted = 0
+            with self.db_connection() as conn:
+                conn.execute("BEGIN")
+                for column in database.BLIND_INDEXES.get(source_table, {}):
+                    conn.execute(f"DROP INDEX IF EXISTS idx_{source_table.lower()}_{column}")
+                conn.execute(f"ALTER TABLE {source_table} RENAME TO {old_table}")
+                conn.execute(database.RECORD_TABLE_SCHEMAS[mode][source_table])
+                self._sealed_tables[source_table] = sealed
+
+                reader = conn.cursor()
+                reader.row_factory = sqlite3.Row
+                reader.execute(f"SELECT * FROM {old_table}")
+                while True:
+                    rows = reader.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for record in self._decrypt_rows(table, rows):
+                        self._insert_record(conn, table, record)
+                    converted += len(rows)
+
+                conn.execute(f"DROP TABLE {old_table}")
+                database.add_blind_index_columns(conn)
+            print(f"Converted {converted} {table} record(s) to '{mode}' storage.")
+
+        with self.db_connection() as conn:
+            conn.execute("VACUUM")
+
+    def is_table_loaded(self, table):
+        return table in self.in_memory_data
+
+    def unload_table(self, table):
+        """Drops a table and its indexes from memory; it is loaded again the next time it is read."""
+        self.in_memory_data.pop(table, None)
+        if table in self.field_caches:
+            self.field_caches[table].clear()
+        for name, (index_table, _, _) in INDEXES.items():
+            if index_table == table:
+                self.indexes[name] = {}
+        for name, (index_table, _, _) in TEXT_INDEXES.items():
+            if index_table == table:
+                self.text_indexes[name].clear()
+        for name, (index_table, _, _) in SPATIAL_INDEXES.items():
+            if index_table == table:
+                self.spatial_indexes[name].clear()
+        if table == 'scooters':
+            self.scooter_telemetry.clear()
+            self._fleet_report = None
+
+    def unload_all_tables(self):
+        """
+        Forgets everything read from the database: all tables, indexes and caches, and the detected storage layout.
+        Needed once the database file itself was replaced, as by a restore; tables are read again when next used.
+        """
+        for table in TABLE_KEYS:
+            self.unload_table(table)
+        self._sealed_tables.clear()
+
+    def load_all_data_to_memory(self, tables=None):
+        """
+        Full resync of the in-memory store from the database. Write paths keep the store up to date
+        record by record, so this is only needed after the database was changed outside this instance.
+        """
+        for table in tables or TABLE_KEYS:
+            self.unload_table(table)
+            _ = self.in_memory_data[table]
         return self.in_memory_data
 
     def add_user(self, username, password, role):
@@ -139,23 +726,32 @@ class DataAccess:
         encrypted_role = self.security.encrypt_data(role.lower())
         encrypted_is_active = self.security.encrypt_data('1')
 
-        sql = "INSERT INTO Users(user_id, username, password_hash, role, is_active) VALUES (?, ?, ?, ?, ?)"
+        sql = "INSERT INTO Users(user_id, username, password_hash, role, is_active, username_bidx) VALUES (?, ?, ?, ?, ?, ?)"
         try:
             with self.db_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(sql, (user_id, encrypted_username, encrypted_password, encrypted_role, encrypted_is_active))
-                self.load_all_data_to_memory()
-                return user_id
+                cursor.execute(sql, (user_id, encrypted_username, encrypted_password, encrypted_role, encrypted_is_active,
+                                     self._blind_index(username.lower())))
+            self._cache_put('users', {
+                'user_id': user_id,
+                'username': username.lower(),
+                'password_hash': hashed_password.decode('utf-8'),
+                'role': role.lower(),
+                'is_active': '1'
+            })
+            return user_id
         except sqlite3.IntegrityError:
             print("Error: This username may already be taken.")
             return None
 
     def find_user_by_username(self, username):
         username = username.lower()
-        for user in self.in_memory_data['users']:
-            if user['username'] and user['username'].lower() == username:
-                if user['is_active'] == '1':
-                    return (user['user_id'], user['password_hash'], user['role'])
+        if self.is_table_loaded('users') or not database.BLIND_INDEXES_ENABLED:
+            user = self._lookup('users_by_username', username)
+        else:
+            user = next(iter(self._find_by_blind_index('users', 'username_bidx', username)), None)
+        if user and user['is_active'] == '1':
+            return (user['user_id'], user['password_hash'], user['role'])
 
         return None
 
@@ -177,8 +773,8 @@ class DataAccess:
             with self.db_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(sql, (new_password_hash, user_id))
-                self.load_all_data_to_memory()
-                return True
+            self._cache_update('users', user_id, password_hash=self.decrypt_value(new_password_hash))
+            return True
         except Exception as e:
             print(f"An error occurred while updating the password: {e}")
             return False
@@ -191,26 +787,27 @@ class DataAccess:
         try:
             with self.db_connection() as conn:
                 conn.execute(sql, (profile_id, user_id, encrypted_first_name, encrypted_last_name, registration_date))
-                self.load_all_data_to_memory()
-                return profile_id
+            self._cache_put('user_profiles', {
+                'profile_id': profile_id,
+                'user_id': user_id,
+                'first_name': first_name,
+                'last_name': last_name,
+                'registration_date': self._stored_text(registration_date)
+            })
+            return profile_id
         except Exception as e:
             print(f"An error occurred while adding a user profile: {e}")
             return None
 
     def get_user_profile_by_user_id(self, user_id, add_username=False):
-        username = ""
-        print("My user_id:", user_id)
-        for user in self.in_memory_data['users']:
-            if user['user_id'] == user_id:
-                username = user['username']
-
-        for profile in self.in_memory_data['user_profiles']:
-            if profile['user_id'] == user_id:
-                if add_username:
-                    return UserProfile(**profile), username
-                return UserProfile(**profile)
-
+        user = self.in_memory_data['users'].get(user_id)
+        username = user['username'] if user else ""
 
+        profile = self._lookup('profiles_by_user_id', user_id)
+        if profile:
+            if add_username:
+                return UserProfile(**profile), username
+            return UserProfile(**profile)
 
         return None
 
@@ -222,8 +819,10 @@ class DataAccess:
         try:
             with self.db_connection() as conn:
                 conn.execute(sql, (encrypted_first_name, encrypted_last_name, user_id))
-                self.load_all_data_to_memory()
-                return True
+            profile = self._lookup('profiles_by_user_id', user_id)
+            if profile:
+                self._cache_update('user_profiles', profile['profile_id'], first_name=first_name, last_name=last_name)
+            return True
         except Exception as e:
             print(f"An error occurred while updating user profile: {e}")
             return False
@@ -231,13 +830,9 @@ class DataAccess:
     def get_all_users_by_role(self, role_to_find):
         users = []
 
-        for user in self.in_memory_data['users']:
-            if user['role'] == role_to_find and user['is_active'] == '1':
-                user_profile = None
-                for profile in self.in_memory_data['user_profiles']:
-                    if profile['user_id'] == user['user_id']:
-                        user_profile = profile
-                        break
+        for user in self._lookup_all('users_by_role', role_to_find):
+            if user['is_active'] == '1':
+                user_profile = self._lookup('profiles_by_user_id', user['user_id'])
 
                 if user_profile:
                     users.append({
@@ -254,50 +849,86 @@ class DataAccess:
             with self.db_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(sql, (user_id,))
-                self.load_all_data_to_memory()
-                return True
+            self._cache_update('users', user_id, is_active='0')
+            return True
         except Exception as e:
             print(f"An error occurred while deleting a user: {e}")
             return False
 
 
+    def _traveller_record(self, traveller: Traveller):
+        return {
+            'customer_id': traveller.customer_id,
+            'first_name': self._stored_text(traveller.first_name),
+            'last_name': self._stored_text(traveller.last_name),
+            'birthday': self._stored_text(traveller.birthday),
+            'gender': self._stored_text(traveller.gender),
+            'street_name': self._stored_text(traveller.street_name),
+            'house_number': self._stored_text(traveller.house_number),
+            'zip_code': self._stored_text(traveller.zip_code),
+            'city': self._stored_text(traveller.city),
+            'email_address': self._stored_text(traveller.email_address),
+            'mobile_phone': self._stored_text(traveller.mobile_phone),
+            'driving_license_number': self._stored_text(traveller.driving_license_number),
+            'registration_date': self._stored_text(traveller.registration_date)
+        }
+
     def add_traveller(self, traveller: Traveller):
         customer_id = str(uuid.uuid4())
-        sql = """INSERT INTO Travellers(customer_id, first_name, last_name, birthday, gender, street_name, house_number, zip_code, city, email_address, mobile_phone, driving_license_number, registration_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+        record = self._traveller_record(traveller)
+        record['customer_id'] = customer_id
         try:
             with self.db_connection() as conn:
-                cursor = conn.cursor()
-                encrypted_data = {
-                    'first_name': self.security.encrypt_data(traveller.first_name),
-                    'last_name': self.security.encrypt_data(traveller.last_name),
-                    'birthday': self.security.encrypt_data(str(traveller.birthday)),
-                    'gender': self.security.encrypt_data(traveller.gender),
-                    'street': self.security.encrypt_data(traveller.street_name),
-                    'house': self.security.encrypt_data(traveller.house_number),
-                    'zip': self.security.encrypt_data(traveller.zip_code),
-                    'city': self.security.encrypt_data(traveller.city),
-                    'email': self.security.encrypt_data(traveller.email_address),
-                    'phone': self.security.encrypt_data(traveller.mobile_phone),
-                    'driving_license_number': self.security.encrypt_data(traveller.driving_license_number)
-                }
-                params = (customer_id, encrypted_data['first_name'], encrypted_data['last_name'],
-                          encrypted_data['birthday'], encrypted_data['gender'],
-                          encrypted_data['street'], encrypted_data['house'], encrypted_data['zip'],
-                          encrypted_data['city'],
-                          encrypted_data['email'], encrypted_data['phone'], encrypted_data['driving_license_number'],
-                          str(traveller.registration_date))
-                cursor.execute(sql, params)
-                self.load_all_data_to_memory()
-                return customer_id
+                stored_values = self._insert_record(conn, 'travellers', record)
+            self._cache_put('travellers', self._resident_record('travellers', record, stored_values))
+            return customer_id
         except sqlite3.IntegrityError:
             print("Error: A traveller with this email address may already exist.")
             return None
 
+    def add_travellers(self, travellers):
+        """
+        Adds many travellers in one transaction, with their fields encrypted in one batch.
+        Returns a (customer_id, error) pair per traveller: the new id, or None and why it was not added.
+        When the batch breaks a constraint the travellers are inserted one by one, so only the offending ones fail.
+        """
+        records = []
+        for traveller in travellers:
+            record = self._traveller_record(traveller)
+            record['customer_id'] = str(uuid.uuid4())
+            records.append(record)
+        if not records:
+            return []
+
+        encoded = self._encode_records('travellers', records)
+        columns = ['customer_id', *encoded[0]]
+        sql = f"INSERT INTO {TABLE_SOURCES['travellers'][0]}({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        rows = [(record['customer_id'], *values.values()) for record, values in zip(records, encoded)]
+        results = [(record['customer_id'], None) for record in records]
+        try:
+            with self.db_connection() as conn:
+                conn.executemany(sql, rows)
+        except sqlite3.IntegrityError:
+            for position, row in enumerate(rows):
+                try:
+                    with self.db_connection() as conn:
+                        conn.execute(sql, row)
+                except sqlite3.IntegrityError:
+                    results[position] = (None, "A traveller with this email address may already exist.")
+
+        for (customer_id, _), record, values in zip(results, records, encoded):
+            if customer_id is not None:
+                self._cache_put('travellers', self._resident_record('travellers', record, values))
+        return results
+
     def search_travellers_by_name_or_id(self, traveller_query):
         results = []
         traveller_query = traveller_query.lower()
 
-        for traveller in self.in_memory_data['travellers']:
+        table = self.in_memory_data['travellers']
+        candidates = self.text_indexes['travellers_text'].candidates(traveller_query)
+        travellers = table.values() if candidates is None else (table[key] for key in candidates)
+        for traveller in travellers:
             if (traveller_query in traveller['first_name'].lower() or
                     traveller_query in traveller['last_name'].lower() or
                     traveller_query in traveller['customer_id'].lower()
@@ -312,44 +943,35 @@ class DataAccess:
         return results
 
     def get_traveller_by_id(self, traveller_id):
-        for traveller in self.in_memory_data['travellers']:
-            if traveller_id in traveller['customer_id']:
-                return Traveller(**traveller)
+        traveller = self.in_memory_data['travellers'].get(traveller_id)
+        if traveller:
+            return Traveller(**self._full_record('travellers', traveller))
         return None
 
+    def find_traveller_by_email(self, email_address):
+        traveller = next(iter(self._find_records('travellers', 'email_bidx', email_address)), None)
+        return Traveller(**traveller) if traveller else None
+
+    def find_travellers_by_driving_license(self, driving_license_number):
+        return [Traveller(**traveller)
+                for traveller in self._find_records('travellers', 'license_bidx', driving_license_number)]
+
+    def find_travellers_by_mobile_phone(self, mobile_phone):
+        return [Traveller(**traveller) for traveller in self._find_records('travellers', 'phone_bidx', mobile_phone)]
+
     def update_traveller(self, traveller: Traveller):
-        sql = """UPDATE Travellers SET
-                    first_name = ?, last_name = ?, birthday = ?, gender = ?,
-                    street_name = ?, house_number = ?, zip_code = ?, city = ?,
-                    email_address = ?, mobile_phone = ?, driving_license_number = ?
-                 WHERE customer_id = ?"""
+        record = self._traveller_record(traveller)
         try:
             with self.db_connection() as conn:
-                cursor = conn.cursor()
-                encrypted_data = {
-                    'first_name': self.security.encrypt_data(traveller.first_name),
-                    'last_name': self.security.encrypt_data(traveller.last_name),
-                    'birthday': self.security.encrypt_data(str(traveller.birthday)),
-                    'gender': self.security.encrypt_data(traveller.gender),
-                    'street': self.security.encrypt_data(traveller.street_name),
-                    'house': self.security.encrypt_data(traveller.house_number),
-                    'zip': self.security.encrypt_data(traveller.zip_code),
-                    'city': self.security.encrypt_data(traveller.city),
-                    'email': self.security.encrypt_data(traveller.email_address),
-                    'phone': self.security.encrypt_data(traveller.mobile_phone),
-                    'driving_license_number': self.security.encrypt_data(traveller.driving_license_number)
-                }
-                params = (
-                    encrypted_data['first_name'], encrypted_data['last_name'], encrypted_data['birthday'],
-                    encrypted_data['gender'],
-                    encrypted_data['street'], encrypted_data['house'], encrypted_data['zip'], encrypted_data['city'],
-                    encrypted_data['email'], encrypted_data['phone'], encrypted_data['driving_license_number'],
-                    traveller.customer_id
-                )
-                cursor.execute(sql, params)
-                if cursor.rowcount > 0:
-                    self.load_all_data_to_memory()
-                return cursor.rowcount > 0
+                stored_values = self._update_record(conn, 'travellers', record, TRAVELLER_FIELDS)
+            if stored_values is None:
+                return False
+            if self._is_on_demand('travellers'):
+                self._cache_put('travellers', self._resident_record('travellers', record, stored_values))
+            else:
+                self._cache_update('travellers', traveller.customer_id,
+                                   **{field: record[field] for field in TRAVELLER_FIELDS})
+            return True
         except sqlite3.IntegrityError:
             print("Error: Update failed. The email address may already be in use by another traveller.")
             return False
@@ -360,69 +982,67 @@ class DataAccess:
             with self.db_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(sql, (traveller_id,))
-                if cursor.rowcount > 0:
-                    self.load_all_data_to_memory()
-                return cursor.rowcount > 0
+                deleted = cursor.rowcount > 0
+            if deleted:
+                self._cache_remove('travellers', traveller_id)
+                self.field_caches['travellers'].pop(traveller_id)
+            return deleted
         except Exception as e:
             print(f"An error occurred deleting traveller: {e}")
             return False
 
+    def _scooter_record(self, scooter: Scooter):
+        return {
+            'scooter_id': scooter.scooter_id,
+            'brand': self._stored_text(scooter.brand),
+            'model': self._stored_text(scooter.model),
+            'serial_number': self._stored_text(scooter.serial_number),
+            'top_speed_kmh': self._stored_text(scooter.top_speed_kmh),
+            'battery_capacity_wh': self._stored_text(scooter.battery_capacity_wh),
+            'soc_percentage': self._stored_text(scooter.soc_percentage),
+            'target_soc_min': self._stored_text(scooter.target_soc_min),
+            'target_soc_max': self._stored_text(scooter.target_soc_max),
+            'location_latitude': self._stored_text(scooter.location_latitude),
+            'location_longitude': self._stored_text(scooter.location_longitude),
+            'out_of_service': '1' if scooter.out_of_service else '0',
+            'mileage_km': self._stored_text(scooter.mileage_km),
+            'last_maintenance_date': str(scooter.last_maintenance_date),
+            'in_service_date': str(scooter.in_service_date)
+        }
+
     def add_scooter(self, scooter: Scooter):
         scooter_id = str(uuid.uuid4())
-        sql = """INSERT INTO Scooters(scooter_id, brand, model, serial_number, top_speed_kmh, battery_capacity_wh, soc_percentage, target_soc_min, target_soc_max, location_latitude, location_longitude, out_of_service, mileage_km, last_maintenance_date, in_service_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+        record = self._scooter_record(scooter)
+        record['scooter_id'] = scooter_id
         try:
             with self.db_connection() as conn:
-                cursor = conn.cursor()
-                encrypted_data = {
-                    'brand': self.encrypt_value(scooter.brand),
-                    'model': self.encrypt_value(scooter.model),
-                    'serial_number': self.encrypt_value(scooter.serial_number),
-                    'top_speed_kmh': self.encrypt_value(scooter.top_speed_kmh),
-                    'battery_capacity_wh': self.encrypt_value(scooter.battery_capacity_wh),
-                    'soc_percentage': self.encrypt_value(scooter.soc_percentage),
-                    'target_soc_min': self.encrypt_value(scooter.target_soc_min),
-                    'target_soc_max': self.encrypt_value(scooter.target_soc_max),
-                    'location_latitude': self.encrypt_value(scooter.location_latitude),
-                    'location_longitude': self.encrypt_value(scooter.location_longitude),
-                    'out_of_service': self.encrypt_value(1 if scooter.out_of_service else 0),
-                    'mileage_km': self.encrypt_value(scooter.mileage_km),
-                    'last_maintenance_date': self.encrypt_value(str(scooter.last_maintenance_date)),
-                    'in_service_date': self.encrypt_value(str(scooter.in_service_date))
-                }
-
-                params = (
-                    scooter_id,
-                    encrypted_data['brand'],
-                    encrypted_data['model'],
-                    encrypted_data['serial_number'],
-                    encrypted_data['top_speed_kmh'],
-                    encrypted_data['battery_capacity_wh'],
-                    encrypted_data['soc_percentage'],
-                    encrypted_data['target_soc_min'],
-                    encrypted_data['target_soc_max'],
-                    encrypted_data['location_latitude'],
-                    encrypted_data['location_longitude'],
-                    encrypted_data['out_of_service'],
-                    encrypted_data['mileage_km'],
-                    encrypted_data['last_maintenance_date'],
-                    encrypted_data['in_service_date']
-                )
-
-                cursor.execute(sql, params)
-                self.load_all_data_to_memory()
-                return scooter_id
+                self._insert_record(conn, 'scooters', record)
+            self._cache_put('scooters', record)
+            return scooter_id
         except sqlite3.IntegrityError:
             print("Error: A scooter with this serial number may already exist.")
             return None
 
-    def search_scooters(self, query):
+    def search_scooters(self, query, limit=None, prefix=False):
+        """
+        Scooters whose brand, model or serial number contains query (or starts with it, with prefix=True),
+        at most limit of them. Substring matches come in table order, prefix matches ordered by the matched text.
+        """
         results = []
         query = query.lower()
 
-        for scooter in self.in_memory_data['scooters']:
-            if (query in str(scooter['brand']).lower() or
-                    query in str(scooter['model']).lower() or
-                    query in str(scooter['serial_number']).lower()):
+        table = self.in_memory_data['scooters']
+        if prefix:
+            scooters = (table[key] for key in self.text_indexes['scooters_prefix'].search(query, limit))
+        else:
+            candidates = self.text_indexes['scooters_text'].candidates(query)
+            scooters = table.values() if candidates is None else (table[key] for key in candidates)
+        for scooter in scooters:
+            if limit is not None and len(results) >= limit:
+                break
+            if prefix or (query in str(scooter['brand']).lower() or
+                          query in str(scooter['model']).lower() or
+                          query in str(scooter['serial_number']).lower()):
                 results.append({
                     'scooter_id': scooter['scooter_id'],
                     'brand': scooter['brand'],
@@ -433,156 +1053,412 @@ class DataAccess:
 
         return results
 
+    def _scooter_location_result(self, scooter, distance_km=None):
+        result = {
+            'scooter_id': scooter['scooter_id'],
+            'brand': scooter['brand'],
+            'model': scooter['model'],
+            'serial_number': scooter['serial_number'],
+            'out_of_service': scooter['out_of_service'],
+            'soc_percentage': scooter['soc_percentage'],
+            'location_latitude': scooter['location_latitude'],
+            'location_longitude': scooter['location_longitude']
+        }
+        if distance_km is not None:
+            result['distance_km'] = round(distance_km, 3)
+        return result
+
+    def find_nearest_scooters(self, latitude, longitude, limit=10, max_distance_km=None):
+        """The scooters closest to a point, nearest first, each with its distance_km."""
+        table = self.in_memory_data['scooters']
+        matches = self.spatial_indexes['scooters_location'].nearest(latitude, longitude, limit, max_distance_km)
+        return [self._scooter_location_result(table[key], distance_km) for distance_km, key in matches]
+
+    def find_scooters_in_radius(self, latitude, longitude, radius_km, limit=None):
+        """The scooters within radius_km of a point, nearest first, each with its distance_km."""
+        table = self.in_memory_data['scooters']
+        matches = self.spatial_indexes['scooters_location'].within_radius(latitude, longitude, radius_km)
+        return [self._scooter_location_result(table[key], distance_km) for distance_km, key in matches[:limit]]
+
+    def find_scooters_in_area(self, min_latitude, min_longitude, max_latitude, max_longitude):
+        """The scooters inside a latitude/longitude bounding box."""
+        table = self.in_memory_data['scooters']
+        keys = self.spatial_indexes['scooters_location'].in_area(min_latitude, min_longitude,
+                                                                 max_latitude, max_longitude)
+        return [self._scooter_location_result(table[key]) for key in keys]
+
+    def filter_scooters(self, needs_charging=False, in_service=None, area=None, min_soc=None, max_soc=None,
+                        limit=None):
+        """
+        Scooters matching all of the given criteria, evaluated on the typed telemetry columns.
+        area is (min_latitude, min_longitude, max_latitude, max_longitude); in_service=False selects
+        scooters that are out of service.
+        """
+        table = self.in_memory_data['scooters']
+        telemetry = self.scooter_telemetry
+        mask = telemetry.all_rows()
+        if min_soc is not None or max_soc is not None:
+            mask &= telemetry.between('soc_percentage', min_soc, max_soc)
+        if needs_charging:
+            mask &= telemetry.needs_charging()
+        if in_service is not None:
+            mask &= telemetry.in_service() if in_service else ~telemetry.in_service()
+        if area is not None:
+            mask &= telemetry.in_area(*area)
+        return [self._scooter_location_result(table[key]) for key in telemetry.keys(mask)[:limit]]
+
+    def get_fleet_report(self, maintenance_interval_days=fleet_report.MAINTENANCE_INTERVAL_DAYS):
+        """
+        Fleet-wide aggregates, see fleet_report.build_fleet_report, with the overdue scooters as summaries.
+        The report is kept until the scooters change or the day changes.
+        """
+        table = self.in_memory_data['scooters']
+        cache_key = (self.scooter_telemetry.version, date.today(), maintenance_interval_days)
+        if self._fleet_report is not None and self._fleet_report[0] == cache_key:
+            return self._fleet_report[1]
+
+        report = fleet_report.build_fleet_report(self.scooter_telemetry, cache_key[1], maintenance_interval_days)
+        report['maintenance_overdue'] = [
+            dict(self._scooter_location_result(table[key]), last_maintenance_date=table[key]['last_maintenance_date'])
+            for key in report['maintenance_overdue']
+        ]
+        self._fleet_report = (cache_key, report)
+        return report
+
     def get_scooter_by_id(self, scooter_id):
-        for scooter in self.in_memory_data['scooters']:
-            if scooter['scooter_id'] == scooter_id:
-                try:
-                    scooter_data = {
-                        'scooter_id': scooter['scooter_id'],
-                        'brand': scooter['brand'],
-                        'model': scooter['model'],
-                        'serial_number': scooter['serial_number'],
-                        'top_speed_kmh': int(scooter['top_speed_kmh']) if scooter['top_speed_kmh'] else None,
-                        'battery_capacity_wh': int(scooter['battery_capacity_wh']) if scooter[
-                            'battery_capacity_wh'] else None,
-                        'soc_percentage': float(scooter['soc_percentage']) if scooter['soc_percentage'] else None,
-                        'target_soc_min': float(scooter['target_soc_min']) if scooter['target_soc_min'] else None,
-                        'target_soc_max': float(scooter['target_soc_max']) if scooter['target_soc_max'] else None,
-                        'location_latitude': float(scooter['location_latitude']) if scooter[
-                            'location_latitude'] else None,
-                        'location_longitude': float(scooter['location_longitude']) if scooter[
-                            'location_longitude'] else None,
-                        'out_of_service': bool(int(scooter['out_of_service'])) if scooter['out_of_service'] else False,
-                        'mileage_km': float(scooter['mileage_km']) if scooter['mileage_km'] else 0,
-                        'last_maintenance_date': scooter['last_maintenance_date'],
-                        'in_service_date': scooter['in_service_date']
-                    }
-                    return Scooter(**scooter_data)
-                except (ValueError, TypeError) as e:
-                    print(f"Error converting scooter data types: {e}")
-                    return None
+        scooter = self.in_memory_data['scooters'].get(scooter_id)
+        if scooter:
+            return self._scooter_from_record(scooter)
 
         return None
 
-    def update_scooter(self, scooter: Scooter):
-        sql = """UPDATE Scooters SET
-                    brand = ?, model = ?, serial_number = ?, top_speed_kmh = ?,
-                    battery_capacity_wh = ?, soc_percentage = ?, target_soc_min = ?,
-                    target_soc_max = ?, location_latitude = ?, location_longitude = ?,
-                    out_of_service = ?, mileage_km = ?, last_maintenance_date = ?
-                 WHERE scooter_id = ?"""
+    def _scooter_from_record(self, scooter):
         try:
-            with self.db_connection() as conn:
-                cursor = conn.cursor()
-
-                encrypted_data = {
-                    'brand': self.encrypt_value(scooter.brand),
-                    'model': self.encrypt_value(scooter.model),
-                    'serial_number': self.encrypt_value(scooter.serial_number),
-                    'top_speed_kmh': self.encrypt_value(scooter.top_speed_kmh),
-                    'battery_capacity_wh': self.encrypt_value(scooter.battery_capacity_wh),
-                    'soc_percentage': self.encrypt_value(scooter.soc_percentage),
-                    'target_soc_min': self.encrypt_value(scooter.target_soc_min),
-                    'target_soc_max': self.encrypt_value(scooter.target_soc_max),
-                    'location_latitude': self.encrypt_value(scooter.location_latitude),
-                    'location_longitude': self.encrypt_value(scooter.location_longitude),
-                    'out_of_service': self.encrypt_value(1 if scooter.out_of_service else 0),
-                    'mileage_km': self.encrypt_value(scooter.mileage_km),
-                    'last_maintenance_date': self.encrypt_value(str(scooter.last_maintenance_date))
-                }
+            scooter_data = {
+                'scooter_id': scooter['scooter_id'],
+                'brand': scooter['brand'],
+                'model': scooter['model'],
+                'serial_number': scooter['serial_number'],
+                'top_speed_kmh': int(scooter['top_speed_kmh']) if scooter['top_speed_kmh'] else None,
+                'battery_capacity_wh': int(scooter['battery_capacity_wh']) if scooter[
+                    'battery_capacity_wh'] else None,
+                'soc_percentage': float(scooter['soc_percentage']) if scooter['soc_percentage'] else None,
+                'target_soc_min': float(scooter['target_soc_min']) if scooter['target_soc_min'] else None,
+                'target_soc_max': float(scooter['target_soc_max']) if scooter['target_soc_max'] else None,
+                'location_latitude': float(scooter['location_latitude']) if scooter[
+                    'location_latitude'] else None,
+                'location_longitude': float(scooter['location_longitude']) if scooter[
+                    'location_longitude'] else None,
+                'out_of_service': bool(int(scooter['out_of_service'])) if scooter['out_of_service'] else False,
+                'mileage_km': float(scooter['mileage_km']) if scooter['mileage_km'] else 0,
+                'last_maintenance_date': scooter['last_maintenance_date'],
+                'in_service_date': scooter['in_service_date']
+            }
+            return Scooter(**scooter_data)
+        except (ValueError, TypeError) as e:
+            print(f"Error converting scooter data types: {e}")
+            return None
 
-                params = (
-                    encrypted_data['brand'],
-                    encrypted_data['model'],
-                    encrypted_data['serial_number'],
-                    encrypted_data['top_speed_kmh'],
-                    encrypted_data['battery_capacity_wh'],
-                    encrypted_data['soc_percentage'],
-                    encrypted_data['target_soc_min'],
-                    encrypted_data['target_soc_max'],
-                    encrypted_data['location_latitude'],
-                    encrypted_data['location_longitude'],
-                    encrypted_data['out_of_service'],
-                    encrypted_data['mileage_km'],
-                    encrypted_data['last_maintenance_date'],
-                    scooter.scooter_id
-                )
+    def find_scooter_by_serial_number(self, serial_number):
+        scooter = next(iter(self._find_records('scooters', 'serial_bidx', serial_number)), None)
+        return self._scooter_from_record(scooter) if scooter else None
 
-                cursor.execute(sql, params)
-                if cursor.rowcount > 0:
-                    self.load_all_data_to_memory()
-                return cursor.rowcount > 0
+    def update_scooter(self, scooter: Scooter):
+        record = self._scooter_record(scooter)
+        try:
+            with self.db_connection() as conn:
+                updated = self._update_record(conn, 'scooters', record, SCOOTER_FIELDS) is not None
+            if updated:
+                self._cache_update('scooters', scooter.scooter_id,
+                                   **{field: record[field] for field in SCOOTER_FIELDS})
+            return updated
         except sqlite3.IntegrityError:
             print("Error: Update failed. The serial number may already be in use by another scooter.")
             return False
 
+    def update_scooter_telemetry(self, updates):
+        """
+        Applies many small scooter updates at once; updates maps scooter_id -> {field: new value}.
+        Only the fields whose value actually changes are encrypted and written, grouped by the set of changed
+        columns into one executemany each, all in a single transaction.
+        Returns (the scooter_ids that changed, the scooter_ids that do not exist).
+        """
+        table = self.in_memory_data['scooters']
+        changes = {}
+        unknown = []
+        for scooter_id, fields in updates.items():
+            record = table.get(scooter_id)
+            if record is None:
+                unknown.append(scooter_id)
+                continue
+            changed = {field: self._stored_text(value) for field, value in fields.items()
+                       if self._stored_text(value) != record[field]}
+            if changed:
+                changes[scooter_id] = changed
+        if not changes:
+            return [], unknown
+
+        if self._is_sealed('Scooters'):
+            # A sealed row is one ciphertext, so any change rewrites all of it.
+            plaintexts = [json.dumps({field: changed.get(field, table[scooter_id][field])
+                                      for field in RECORD_FIELDS['scooters']}, separators=(',', ':'))
+                          for scooter_id, changed in changes.items()]
+            encoded = [{'sealed_record': ciphertext} for ciphertext in self.security.encrypt_many(plaintexts)]
+        else:
+            ciphertexts = iter(self.security.encrypt_many(
+                [value for changed in changes.values() for value in changed.values() if value is not None]))
+            encoded = [{field: next(ciphertexts) if value is not None else None for field, value in changed.items()}
+                       for changed in changes.values()]
+
+        statements = {}
+        for scooter_id, values in zip(changes, encoded):
+            statements.setdefault(tuple(values), []).append((*values.values(), scooter_id))
+        with self.db_connection() as conn:
+            for columns, rows in statements.items():
+                assignments = ', '.join(f"{column} = ?" for column in columns)
+                conn.executemany(f"UPDATE Scooters SET {assignments} WHERE scooter_id = ?", rows)
+
+        for scooter_id, changed in changes.items():
+            self._cache_update('scooters', scooter_id, **changed)
+        return list(changes), unknown
+
     def delete_scooter_by_id(self, scooter_id):
         sql = "DELETE FROM Scooters WHERE scooter_id = ?"
         try:
             with self.db_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(sql, (scooter_id,))
-                if cursor.rowcount > 0:
-                    self.load_all_data_to_memory()
-                return cursor.rowcount > 0
+                deleted = cursor.rowcount > 0
+            if deleted:
+                self._cache_remove('scooters', scooter_id)
+            return deleted
         except Exception as e:
             print(f"An error occurred deleting scooter: {e}")
             return False
 
     def add_log_entry(self, username, event_type, description, additional_info="", is_suspicious=0):
+        """
+        Records a log entry. It is visible in memory right away; the database write is queued for the
+        audit writer, see AUDIT_ASYNC. Use flush_audit_log to wait until it has been written.
+        """
         from datetime import datetime
         log_id = str(uuid.uuid4())
         timestamp = datetime.now().isoformat()
 
-        encrypted_data = {
-            'timestamp': self.encrypt_value(timestamp),
-            'username': self.encrypt_value(username),
-            'event_type': self.encrypt_value(event_type),
-            'description': self.encrypt_value(description),
-            'additional_info': self.encrypt_value(additional_info) if additional_info else None,
-            'is_suspicious': is_suspicious,
-            'is_read': 0
+        entry = {
+            'log_id': log_id,
+            'timestamp': timestamp,
+            'username': username,
+            'event_type': event_type,
+            'description': description,
+            'additional_info': additional_info if additional_info else None,
+            'is_suspicious': is_suspicious
         }
-
-        sql = """INSERT INTO Logs(log_id, timestamp, username, event_type, description, additional_info, is_suspicious, is_read) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
         try:
-            with self.db_connection() as conn:
-                conn.execute(sql,
-                             (log_id,
-                              encrypted_data['timestamp'],
-                              encrypted_data['username'],
-                              encrypted_data['event_type'],
-                              encrypted_data['description'],
-                              encrypted_data['additional_info'],
-                              encrypted_data['is_suspicious'],
-                              encrypted_data['is_read']))
-                self.load_all_data_to_memory()
-                return log_id
+            if AUDIT_ASYNC:
+                self.audit_writer.submit(entry)
+            else:
+                self._write_log_entries([entry])
+            self._cache_put('logs', {
+                'log_id': log_id,
+                'timestamp': timestamp,
+                'username': self._stored_text(username),
+                'event_type': self._stored_text(event_type),
+                'description': self._stored_text(description),
+                'additional_info': self._stored_text(additional_info) if additional_info else None,
+                'is_suspicious': is_suspicious
+            })
+            return log_id
         except Exception as e:
             print(f"An error occurred while adding a log entry: {e}")
             return None
 
+    def _write_log_entries(self, entries):
+        """Encrypts a batch of log entries in one call and inserts them in a single transaction."""
+        encrypted_fields = ('timestamp', 'username', 'event_type', 'description', 'additional_info')
+        plaintexts = [str(entry[field]) for entry in entries for field in encrypted_fields if entry[field] is not None]
+        ciphertexts = iter(self.security.encrypt_many(plaintexts))
+
+        rows = []
+        for entry in entries:
+            encrypted = {field: next(ciphertexts) if entry[field] is not None else None for field in encrypted_fields}
+            rows.append((entry['log_id'], encrypted['timestamp'], encrypted['username'], encrypted['event_type'],
+                         encrypted['description'], encrypted['additional_info'], entry['is_suspicious']))
+
+        sql = """INSERT INTO Logs(log_id, timestamp, username, event_type, description, additional_info, is_suspicious) VALUES (?, ?, ?, ?, ?, ?, ?)"""
+        try:
+            with self.db_connection() as conn:
+                conn.executemany(sql, rows)
+        except sqlite3.IntegrityError:
+            # Retry one by one, so a single invalid entry does not cost the rest of the batch.
+            for row in rows:
+                try:
+                    with self.db_connection() as conn:
+                        conn.execute(sql, row)
+                except sqlite3.IntegrityError as e:
+                    print(f"An error occurred while adding a log entry: {e}")
+
+    def flush_audit_log(self):
+        """Blocks until every queued log entry has been written to the database."""
+        self.audit_writer.flush()
+
     def get_all_logs(self):
-        sorted_logs = sorted(self.in_memory_data['logs'], key=lambda x: x['timestamp'], reverse=True)
-        return sorted_logs
+        return self.in_memory_data['logs'].newest_first()
+
+    def get_logs_page(self, before=None, page_size=10):
+        """
+        One page of logs, newest first, read straight from the database without loading the logs table.
+        Returns (logs, next_cursor); pass next_cursor as before to get the following page. It is None on the
+        last page. Paging follows insertion order (the rowid) and only the rows on the page are decrypted.
+        """
+        self.flush_audit_log()
+        sql = "SELECT rowid AS page_key, * FROM Logs"
+        params = []
+        if before is not None:
+            sql += " WHERE rowid < ?"
+            params.append(before)
+        sql += " ORDER BY rowid DESC LIMIT ?"
+        params.append(page_size + 1)
+
+        with self.db_connection() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(sql, params).fetchall()
+        page_rows = rows[:page_size]
+        logs = self._decrypt_rows('logs', [{key: row[key] for key in row.keys() if key != 'page_key'}
+                                           for row in page_rows])
+        next_cursor = page_rows[-1]['page_key'] if len(rows) > page_size else None
+        return logs, next_cursor
 
     def get_unread_suspicious_logs_count(self):
-        count = 0
-        for log in self.in_memory_data['logs']:
-            if log['is_suspicious'] == 1 and log['is_read'] == 0:
-                count += 1
+        if self.is_table_loaded('logs'):
+            return self.in_memory_data['logs'].unread_suspicious_count
+        # is_suspicious is stored in plain text, so only the timestamps of suspicious logs have to be decrypted
+        # to compare them with the read watermark, instead of loading the whole table.
+        self.flush_audit_log()
+        read_mark = self._load_log_read_mark()
+        with self.db_connection() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("SELECT log_id, timestamp FROM Logs WHERE is_suspicious = 1").fetchall()
+        return sum(1 for record in self._decrypt_rows('logs', rows)
+                   if read_mark is None or LogStore.sort_key(record) > read_mark)
+
+    def archive_old_logs(self, retention_days=None):
+        """
+        Moves logs older than the retention window into compressed, encrypted archive segments and removes
+        them from the Logs table. Only logs at or before the read watermark are archived, so unread entries
+        stay in the live table. Logs are taken oldest first in insertion order, stopping at the first one that
+        must stay. Returns the number of archived logs.
+        """
+        from datetime import datetime, timedelta
+        if retention_days is None:
+            retention_days = LOG_RETENTION_DAYS
+        cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+        self.flush_audit_log()
+        read_mark = (self.in_memory_data['logs'].read_mark if self.is_table_loaded('logs')
+                     else self._load_log_read_mark())
+        if read_mark is None:
+            return 0
+
+        def must_stay(record):
+            return record['timestamp'] >= cutoff or LogStore.sort_key(record) > read_mark
+
+        # Only log_id and timestamp are decrypted to decide what goes, the oldest log first, so a startup with
+        # nothing to archive decrypts a single timestamp. Full rows are decrypted only for the logs archived.
+        with self.db_connection() as conn:
+            conn.row_factory = sqlite3.Row
+            oldest = conn.execute("SELECT log_id, timestamp FROM Logs ORDER BY rowid LIMIT 1").fetchall()
+        if not oldest or must_stay(self._decrypt_rows('logs', oldest)[0]):
+            return 0
 
-        return count
+        archived = 0
+        while True:
+            with self.db_connection() as conn:
+                conn.row_factory = sqlite3.Row
+                rows = conn.execute("SELECT log_id, timestamp FROM Logs ORDER BY rowid LIMIT ?",
+                                    (LOG_ARCHIVE_SEGMENT_SIZE,)).fetchall()
+            count = 0
+            for record in self._decrypt_rows('logs', rows):
+                if must_stay(record):
+                    break
+                count += 1
+            if not count:
+                break
+            with self.db_connection() as conn:
+                conn.row_factory = sqlite3.Row
+                records = self._decrypt_rows('logs', conn.execute("SELECT * FROM Logs ORDER BY rowid LIMIT ?",
+                                                                  (count,)).fetchall())
 
-    def mark_all_logs_as_read(self):
-        sql = "UPDATE Logs SET is_read = ? WHERE is_read = ?"
-        try:
+            segment_id = str(uuid.uuid4())
+            file_name = log_archive.write_segment(self.security, segment_id, records)
+            timestamps = sorted(record['timestamp'] for record in records)
             with self.db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(sql, (1, 0))
-                self.load_all_data_to_memory()
+                conn.execute("INSERT INTO LogArchiveSegments (segment_id, file_name, first_timestamp, last_timestamp, "
+                             "entry_count, suspicious_count) VALUES (?, ?, ?, ?, ?, ?)",
+                             (segment_id, file_name, self.encrypt_value(timestamps[0]),
+                              self.encrypt_value(timestamps[-1]), len(records),
+                              sum(1 for record in records if record['is_suspicious'] == 1)))
+                conn.executemany("DELETE FROM Logs WHERE log_id = ?", [(record['log_id'],) for record in records])
+            for record in records:
+                self._cache_remove('logs', record['log_id'])
+            archived += len(records)
+            if count < len(rows):
+                break
+        if archived:
+            print(f"Archived {archived} log entries older than {retention_days} days.")
+        return archived
+
+    def get_archive_segments(self):
+        """The index of the log archive: one dict per segment with its time range and counts, oldest first."""
+        with self.db_connection() as conn:
+            rows = conn.execute("SELECT segment_id, file_name, first_timestamp, last_timestamp, entry_count, "
+                                "suspicious_count FROM LogArchiveSegments").fetchall()
+        segments = [{
+            'segment_id': segment_id,
+            'file_name': file_name,
+            'first_timestamp': self.decrypt_value(first_timestamp),
+            'last_timestamp': self.decrypt_value(last_timestamp),
+            'entry_count': entry_count,
+            'suspicious_count': suspicious_count
+        } for segment_id, file_name, first_timestamp, last_timestamp, entry_count, suspicious_count in rows]
+        return sorted(segments, key=lambda segment: segment['first_timestamp'])
+
+    def get_archived_logs(self, start=None, end=None):
+        """
+        Archived logs with start <= timestamp < end (ISO strings, either may be None), newest first.
+        Only the segments whose time range overlaps the requested one are read.
+        """
+        logs = []
+        for segment in self.get_archive_segments():
+            if (start is not None and segment['last_timestamp'] < start) or \
+                    (end is not None and segment['first_timestamp'] >= end):
+                continue
+            try:
+                records = log_archive.read_segment(self.security, segment['file_name'])
+            except Exception as e:
+                print(f"An error occurred while reading log archive segment {segment['file_name']}: {e}")
+                continue
+            logs.extend(record for record in records
+                        if (start is None or record['timestamp'] >= start) and
+                        (end is None or record['timestamp'] < end))
+        logs.sort(key=LogStore.sort_key, reverse=True)
+        return logs
+
+    def mark_all_logs_as_read(self, newest_log=None):
+        """
+        Moves the read watermark to the newest log; a single-row write however many logs there are.
+        Pass the newest log when it is already known, e.g. from get_logs_page, to avoid loading the logs table.
+        """
+        try:
+            if newest_log is not None:
+                read_mark = LogStore.sort_key(newest_log)
+                if self.is_table_loaded('logs'):
+                    self.in_memory_data['logs'].set_read_mark(read_mark)
+            else:
+                read_mark = self.in_memory_data['logs'].mark_all_read()
+            if read_mark is not None:
+                self._save_log_read_mark(read_mark)
 
-                return True
+            return True
         except Exception as e:
             print(f"An error occurred while marking logs as read: {e}")
             return False
@@ -615,16 +1491,24 @@ class DataAccess:
                 )
 
                 cursor.execute(sql, params)
-                self.load_all_data_to_memory()
-                return code_id
+            self._cache_put('restore_codes', {
+                'code_id': code_id,
+                'restore_code': self._stored_text(code.restore_code),
+                'backup_filename': self._stored_text(code.backup_filename),
+                'system_admin_id': code.system_admin_id,
+                'status': self._stored_text(code.status),
+                'generated_at': str(code.generated_at),
+                'expires_at': str(code.expires_at)
+            })
+            return code_id
         except Exception as e:
             print(f"An error occurred saving the restore code: {e}")
             return None
 
     def get_restore_code(self, code_value):
-        for code in self.in_memory_data['restore_codes']:
-            if code['restore_code'] == code_value:
-                return RestoreCode(**code)
+        code = self._lookup('restore_codes_by_code', code_value)
+        if code:
+            return RestoreCode(**code)
 
         return None
 
@@ -636,17 +1520,15 @@ class DataAccess:
                 cursor = conn.cursor()
                 cursor.execute(query, params)
                 conn.commit()
+            for code in self._lookup_all('restore_codes_by_admin', system_admin_id):
+                self._cache_remove('restore_codes', code['code_id'])
             return True
         except Exception as e:
             print(f"An error occurred while deleting restore codes: {e}")
             return False
 
     def get_restore_codes_by_system_admin(self, system_admin_id):
-        restore_codes = []
-        for code in self.in_memory_data['restore_codes']:
-            if code['system_admin_id'] == system_admin_id:
-                restore_codes.append(RestoreCode(**code))
-        return restore_codes
+        return [RestoreCode(**code) for code in self._lookup_all('restore_codes_by_admin', system_admin_id)]
 
     def update_restore_code_status(self, code_id, new_status):
         sql = "UPDATE RestoreCodes SET status = ? WHERE code_id = ?"
@@ -655,11 +1537,12 @@ class DataAccess:
                 cursor = conn.cursor()
                 encrypted_status = self.encrypt_value(new_status)
                 cursor.execute(sql, (encrypted_status, code_id))
+                updated = cursor.rowcount > 0
 
-                if cursor.rowcount > 0:
-                    self.load_all_data_to_memory()
+            if updated:
+                self._cache_update('restore_codes', code_id, status=self._stored_text(new_status))
 
-                return cursor.rowcount > 0
+            return updated
         except Exception as e:
             print(f"An error occurred updating the restore code status: {e}")
             return False
@@ -670,9 +1553,10 @@ class DataAccess:
             with self.db_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(sql, (code_id,))
-                if cursor.rowcount > 0:
-                    self.load_all_data_to_memory()
-                return cursor.rowcount > 0
+                deleted = cursor.rowcount > 0
+            if deleted:
+                self._cache_remove('restore_codes', code_id)
+            return deleted
         except Exception as e:
             print(f"An error occurred deleting the restore code: {e}")
             return False
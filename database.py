@@ -4,12 +4,110 @@ import uuid
 
 DATABASE_NAME = "urban_mobility.db"
 
+# Pragmas applied to every new connection, in this order.
+# cache_size is negative to mean KiB instead of pages; busy_timeout is in milliseconds.
+CONNECTION_PRAGMAS = {
+    'foreign_keys': 1,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 64 * 1024 * 1024,
+    'cache_size': -16000,
+    'busy_timeout': 5000
+}
 
-def connect_db():
+# Size of the per-connection prepared statement cache (sqlite3's default is 128).
+CACHED_STATEMENTS = 512
+
+# Keyed-HMAC blind indexes next to encrypted columns, so equality lookups and UNIQUE checks can run in SQL.
+# table -> blind index column -> (encrypted source column, unique)
+BLIND_INDEXES_ENABLED = True
+BLIND_INDEXES = {
+    'Users': {
+        'username_bidx': ('username', True)
+    },
+    'Travellers': {
+        'email_bidx': ('email_address', True),
+        'license_bidx': ('driving_license_number', False),
+        'phone_bidx': ('mobile_phone', False)
+    },
+    'Scooters': {
+        'serial_bidx': ('serial_number', True)
+    }
+}
+
+# How Travellers and Scooters rows are stored in new databases:
+#   'column' - every field is its own Fernet token
+#   'row'    - all fields of a record are serialized together into a single token in sealed_record
+# DataAccess detects the layout of an existing database, so this only matters for initialize_database.
+# DataAccess.convert_record_storage migrates an existing database between the two.
+RECORD_STORAGE_MODE = 'column'
+
+RECORD_TABLE_SCHEMAS = {
+    'column': {
+        'Travellers': """
+    CREATE TABLE IF NOT EXISTS Travellers (
+        customer_id TEXT PRIMARY KEY,
+        first_name BLOB NOT NULL,
+        last_name BLOB NOT NULL,
+        birthday BLOB NOT NULL,
+        gender BLOB,
+        street_name BLOB,
+        house_number BLOB,
+        zip_code BLOB,
+        city BLOB,
+        email_address BLOB UNIQUE,
+        mobile_phone BLOB,
+        driving_license_number BLOB NOT NULL,
+        registration_date BLOB NOT NULL,
+        email_bidx TEXT,
+        license_bidx TEXT,
+        phone_bidx TEXT
+    );""",
+        'Scooters': """
+    CREATE TABLE IF NOT EXISTS Scooters (
+        scooter_id TEXT PRIMARY KEY,
+        brand BLOB NOT NULL,
+        model BLOB NOT NULL,
+        serial_number BLOB NOT NULL UNIQUE,
+        top_speed_kmh BLOB,
+        battery_capacity_wh BLOB,
+        soc_percentage BLOB,
+        target_soc_min BLOB,
+        target_soc_max BLOB,
+        location_latitude BLOB,
+        location_longitude BLOB,
+        out_of_service BLOB NOT NULL DEFAULT 0,
+        mileage_km BLOB NOT NULL DEFAULT 0,
+        last_maintenance_date BLOB,
+        in_service_date BLOB NOT NULL,
+        serial_bidx TEXT
+    );"""
+    },
+    'row': {
+        'Travellers': """
+    CREATE TABLE IF NOT EXISTS Travellers (
+        customer_id TEXT PRIMARY KEY,
+        sealed_record BLOB NOT NULL,
+        email_bidx TEXT,
+        license_bidx TEXT,
+        phone_bidx TEXT
+    );""",
+        'Scooters': """
+    CREATE TABLE IF NOT EXISTS Scooters (
+        scooter_id TEXT PRIMARY KEY,
+        sealed_record BLOB NOT NULL,
+        serial_bidx TEXT
+    );"""
+    }
+}
+
+
+def connect_db(pragmas=None):
     conn = None
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        conn.execute("PRAGMA foreign_keys = 1;")
+        conn = sqlite3.connect(DATABASE_NAME, cached_statements=CACHED_STATEMENTS)
+        for name, value in (pragmas if pragmas is not None else CONNECTION_PRAGMAS).items():
+            conn.execute(f"PRAGMA {name} = {value};")
     except Error as e:
         print(f"Error connecting to database: {e}")
     return conn
@@ -23,6 +121,21 @@ def create_table(conn, create_table_sql):
         print(f"Error creating table: {e}")
 
 
+def get_table_columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def add_blind_index_columns(conn):
+    for table, columns in BLIND_INDEXES.items():
+        existing_columns = get_table_columns(conn, table)
+        for column, (_, unique) in columns.items():
+            if column not in existing_columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+            index_type = "UNIQUE INDEX" if unique else "INDEX"
+            conn.execute(f"CREATE {index_type} IF NOT EXISTS idx_{table.lower()}_{column} ON {table} ({column})")
+    conn.commit()
+
+
 def initialize_database():
     sql_create_users_table = """
     CREATE TABLE IF NOT EXISTS Users (
@@ -30,7 +143,8 @@ def initialize_database():
         username BLOB NOT NULL UNIQUE,
         password_hash BLOB NOT NULL,
         role BLOB NOT NULL,
-        is_active BLOB NOT NULL DEFAULT 1
+        is_active BLOB NOT NULL DEFAULT 1,
+        username_bidx TEXT
     );"""
 
     sql_create_user_profiles_table = """
@@ -43,42 +157,6 @@ def initialize_database():
         FOREIGN KEY (user_id) REFERENCES Users (user_id) ON DELETE CASCADE
     );"""
 
-    sql_create_travellers_table = """
-    CREATE TABLE IF NOT EXISTS Travellers (
-        customer_id TEXT PRIMARY KEY,
-        first_name BLOB NOT NULL,
-        last_name BLOB NOT NULL,
-        birthday BLOB NOT NULL,
-        gender BLOB,
-        street_name BLOB,
-        house_number BLOB,
-        zip_code BLOB,
-        city BLOB,
-        email_address BLOB UNIQUE,
-        mobile_phone BLOB,
-        driving_license_number BLOB NOT NULL,
-        registration_date BLOB NOT NULL
-    );"""
-
-    sql_create_scooters_table = """
-    CREATE TABLE IF NOT EXISTS Scooters (
-        scooter_id TEXT PRIMARY KEY,
-        brand BLOB NOT NULL,
-        model BLOB NOT NULL,
-        serial_number BLOB NOT NULL UNIQUE,
-        top_speed_kmh BLOB,
-        battery_capacity_wh BLOB,
-        soc_percentage BLOB,
-        target_soc_min BLOB,
-        target_soc_max BLOB,
-        location_latitude BLOB,
-        location_longitude BLOB,
-        out_of_service BLOB NOT NULL DEFAULT 0,
-        mileage_km BLOB NOT NULL DEFAULT 0,
-        last_maintenance_date BLOB,
-        in_service_date BLOB NOT NULL
-    );"""
-
     sql_create_restore_codes_table = """
     CREATE TABLE IF NOT EXISTS RestoreCodes (
         code_id TEXT PRIMARY KEY,
@@ -100,7 +178,26 @@ def initialize_database():
         description BLOB NOT NULL,
         additional_info BLOB,
         is_suspicious BLOB NOT NULL DEFAULT 0,
-        is_read BLOB NOT NULL DEFAULT 0 -- 0 for unread, 1 for read
+        is_read BLOB NOT NULL DEFAULT 0 -- no longer written, read state is kept in LogReadMarks
+    );"""
+
+    # Logs up to and including (last_read_timestamp, last_read_log_id) have been read.
+    sql_create_log_read_marks_table = """
+    CREATE TABLE IF NOT EXISTS LogReadMarks (
+        mark_id TEXT PRIMARY KEY,
+        last_read_timestamp BLOB NOT NULL,
+        last_read_log_id TEXT NOT NULL
+    );"""
+
+    # Index of the log archive segment files, see log_archive.py.
+    sql_create_log_archive_segments_table = """
+    CREATE TABLE IF NOT EXISTS LogArchiveSegments (
+        segment_id TEXT PRIMARY KEY,
+        file_name TEXT NOT NULL,
+        first_timestamp BLOB NOT NULL,
+        last_timestamp BLOB NOT NULL,
+        entry_count INTEGER NOT NULL,
+        suspicious_count INTEGER NOT NULL
     );"""
 
     conn = connect_db()
@@ -109,10 +206,13 @@ def initialize_database():
         print("Creating tables...")
         create_table(conn, sql_create_users_table)
         create_table(conn, sql_create_user_profiles_table)
-        create_table(conn, sql_create_travellers_table)
-        create_table(conn, sql_create_scooters_table)
+        create_table(conn, RECORD_TABLE_SCHEMAS[RECORD_STORAGE_MODE]['Travellers'])
+        create_table(conn, RECORD_TABLE_SCHEMAS[RECORD_STORAGE_MODE]['Scooters'])
         create_table(conn, sql_create_restore_codes_table)
         create_table(conn, sql_create_logs_table)
+        create_table(conn, sql_create_log_read_marks_table)
+        create_table(conn, sql_create_log_archive_segments_table)
+        add_blind_index_columns(conn)
         print("Tables created successfully (if they didn't already exist).")
         conn.close()
     else:
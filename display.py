@@ -17,24 +17,35 @@ def display_search_results_table(items, display_key):
             return None
 
 
-def display_system_logs_paginated(logs):
-    if not logs:
+def paginate_list(items, page_size=10):
+    """Serves a list that is already in memory in the (first_page, fetch_page) form of display_system_logs_paginated."""
+    def fetch_page(before):
+        start = before or 0
+        end = start + page_size
+        return items[start:end], (end if end < len(items) else None)
+
+    return fetch_page(None), fetch_page
+
+
+def display_system_logs_paginated(first_page, fetch_page):
+    """
+    first_page is a (logs, next_cursor) pair; fetch_page(before) returns the page after the given cursor
+    in the same form. Pages are fetched only when the user moves to them.
+    """
+    page_logs, next_cursor = first_page
+    if not page_logs:
         print("No logs found.")
         input("\nPress Enter to return...")
         return
 
-    page_size = 10
     page = 0
-    total_pages = (len(logs) - 1) // page_size + 1
+    # The cursor each visited page was fetched with; the first page has none.
+    page_cursors = [None]
 
     while True:
         # Import moved inside to avoid circular dependency issues
         from ui_utils import display_header, get_input
-        display_header(f"System Logs (Page {page + 1}/{total_pages})")
-
-        start_index = page * page_size
-        end_index = start_index + page_size
-        page_logs = logs[start_index:end_index]
+        display_header(f"System Logs (Page {page + 1}{'' if next_cursor is not None else ', last'})")
 
         # Define headers and column widths
         headers = ["Time", "User", "Event", "Description", "Details", "Suspicious"]
@@ -87,14 +98,18 @@ def display_system_logs_paginated(logs):
         choice = get_input("Your choice").upper()
 
         if choice == 'N':
-            if page < total_pages - 1:
+            if next_cursor is not None:
+                del page_cursors[page + 1:]
+                page_cursors.append(next_cursor)
                 page += 1
+                page_logs, next_cursor = fetch_page(page_cursors[page])
             else:
                 print("Already on the last page.")
                 time.sleep(1)
         elif choice == 'P':
             if page > 0:
                 page -= 1
+                page_logs, next_cursor = fetch_page(page_cursors[page])
             else:
                 print("Already on the first page.")
                 time.sleep(1)
@@ -129,6 +144,6 @@ if __name__ == '__main__':
             "is_suspicious": i % 2 == 0
         } for i in range(25)
     ]
-    display_system_logs_paginated(example_logs)
+    display_system_logs_paginated(*paginate_list(example_logs))
     print("--- End of Display Module Test ---")
     input("\nPress Enter to exit...")
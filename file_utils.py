@@ -0,0 +1,11 @@
+import os
+
+
+def write_file_atomically(path, data):
+    """Writes a file under a temporary name and moves it into place, so it is either complete or absent."""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
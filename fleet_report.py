@@ -0,0 +1,75 @@
+import numpy as np
+
+# A scooter is overdue for maintenance this many days after its last_maintenance_date.
+MAINTENANCE_INTERVAL_DAYS = 180
+# Upper bounds of the mileage distribution buckets, in km; the last bucket is open.
+MILEAGE_BUCKETS_KM = (500, 1000, 2500, 5000, 10000)
+PERCENTILES = (10, 50, 90)
+
+
+def _stats(values):
+    """Mean and percentiles of the values that are not NaN, or None when there are none."""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    stats = {'mean': float(values.mean())}
+    for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        stats[f'p{percentile}'] = float(value)
+    return stats
+
+
+def build_fleet_report(telemetry, today, maintenance_interval_days=MAINTENANCE_INTERVAL_DAYS):
+    """
+    Fleet-wide aggregates computed from the columns of a ScooterTelemetry store.
+    Overdue scooters are returned as scooter_ids, oldest maintenance first.
+    """
+    soc = telemetry.column('soc_percentage')
+    mileage = telemetry.column('mileage_km')
+    out_of_service = telemetry.column('out_of_service')
+    maintenance = telemetry.column('last_maintenance_date')
+    total = len(telemetry)
+
+    # Sorting the rows by model group once makes every group a contiguous slice.
+    group_of = telemetry.column('model_group')
+    order = np.argsort(group_of, kind='stable')
+    group_counts = np.bincount(group_of, minlength=len(telemetry.model_groups))
+    group_ends = np.cumsum(group_counts)
+    group_out_of_service = np.bincount(group_of, weights=out_of_service, minlength=len(group_counts))
+    by_model = []
+    for group in np.flatnonzero(group_counts):
+        rows = order[group_ends[group] - group_counts[group]:group_ends[group]]
+        brand, model = telemetry.model_groups[group]
+        by_model.append({
+            'brand': brand,
+            'model': model,
+            'count': int(group_counts[group]),
+            'out_of_service_share': float(group_out_of_service[group] / group_counts[group]),
+            'soc': _stats(soc[rows]),
+            'mileage': _stats(mileage[rows])
+        })
+    by_model.sort(key=lambda group: (group['brand'], group['model']))
+
+    bucket_of = np.searchsorted(MILEAGE_BUCKETS_KM, mileage[~np.isnan(mileage)], side='right')
+    bucket_counts = np.bincount(bucket_of, minlength=len(MILEAGE_BUCKETS_KM) + 1)
+    bucket_labels = [f'< {MILEAGE_BUCKETS_KM[0]}'] + \
+                    [f'{low} - {high}' for low, high in zip(MILEAGE_BUCKETS_KM, MILEAGE_BUCKETS_KM[1:])] + \
+                    [f'>= {MILEAGE_BUCKETS_KM[-1]}']
+
+    due_before = np.datetime64(today, 'D') - np.timedelta64(maintenance_interval_days, 'D')
+    overdue = maintenance < due_before
+    overdue_rows = np.flatnonzero(overdue)
+    overdue_rows = overdue_rows[np.argsort(maintenance[overdue_rows], kind='stable')]
+
+    return {
+        'total': total,
+        'out_of_service': int(out_of_service.sum()),
+        'out_of_service_share': float(out_of_service.mean()) if total else 0.0,
+        'needs_charging': int((telemetry.needs_charging() & telemetry.in_service()).sum()),
+        'soc': _stats(soc),
+        'mileage': _stats(mileage),
+        'mileage_distribution': list(zip(bucket_labels, bucket_counts.tolist())),
+        'by_model': by_model,
+        'maintenance_interval_days': maintenance_interval_days,
+        'maintenance_overdue': telemetry.keys(overdue_rows),
+        'maintenance_unknown': int(np.isnat(maintenance).sum())
+    }
@@ -0,0 +1,249 @@
+import heapq
+import math
+from array import array
+from bisect import bisect_left, insort
+from itertools import count
+
+
+class NGramIndex:
+    """
+    Inverted index from the n-grams of lower-cased text fields to record keys, for substring search.
+    Every record containing a query as a substring has all of the query's n-grams, so intersecting their
+    posting lists gives a small candidate set that only needs a final substring check.
+
+    Keys get an increasing number when first added, and posting lists are sorted arrays of those numbers.
+    That keeps the index compact, and candidates come back in the order records were first added,
+    like iterating the table they index.
+    """
+
+    def __init__(self, n=3):
+        self.n = n
+        self._postings = {}
+        self._ids = {}
+        self._keys = {}
+        self._counter = count()
+
+    def _grams(self, texts):
+        grams = set()
+        for text in texts:
+            if not text:
+                continue
+            text = str(text).lower()
+            grams.update(text[i:i + self.n] for i in range(len(text) - self.n + 1))
+        return grams
+
+    def add(self, key, texts):
+        key_id = self._ids.get(key)
+        if key_id is None:
+            key_id = self._ids[key] = next(self._counter)
+            self._keys[key_id] = key
+        for gram in self._grams(texts):
+            ids = self._postings.get(gram)
+            if ids is None:
+                self._postings[gram] = array('i', (key_id,))
+            elif ids[-1] < key_id:
+                ids.append(key_id)
+            else:
+                position = bisect_left(ids, key_id)
+                if position == len(ids) or ids[position] != key_id:
+                    insort(ids, key_id)
+
+    def remove(self, key, texts, forget=True):
+        """Removes a key indexed under texts. With forget=False it keeps its place in the order, for a re-add."""
+        key_id = self._ids.get(key)
+        if key_id is None:
+            return
+        for gram in self._grams(texts):
+            ids = self._postings.get(gram)
+            if ids is None:
+                continue
+            position = bisect_left(ids, key_id)
+            if position < len(ids) and ids[position] == key_id:
+                del ids[position]
+                if not ids:
+                    del self._postings[gram]
+        if forget:
+            del self._ids[key]
+            del self._keys[key_id]
+
+    def candidates(self, query):
+        """
+        Keys that may contain query as a substring, or None when the query is shorter than n
+        and the index cannot narrow it down.
+        """
+        grams = self._grams([query])
+        if len(str(query)) < self.n or not grams:
+            return None
+        postings = []
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if ids is None:
+                return []
+            postings.append(ids)
+        postings.sort(key=len)
+        key_ids = set(postings[0])
+        for ids in postings[1:]:
+            key_ids.intersection_update(ids)
+            if not key_ids:
+                return []
+        return [self._keys[key_id] for key_id in sorted(key_ids)]
+
+    def clear(self):
+        self._postings = {}
+        self._ids = {}
+        self._keys = {}
+
+
+class PrefixIndex:
+    """
+    Sorted list of the lower-cased text fields of records, for prefix search with a binary search.
+    Has the same add/remove interface as NGramIndex; matches come back ordered by the text they matched on.
+    """
+
+    def __init__(self):
+        self._entries = []
+
+    @staticmethod
+    def _texts(texts):
+        return {str(text).lower() for text in texts if text}
+
+    def add(self, key, texts):
+        for text in self._texts(texts):
+            insort(self._entries, (text, key))
+
+    def remove(self, key, texts, forget=True):
+        for text in self._texts(texts):
+            position = bisect_left(self._entries, (text, key))
+            if position < len(self._entries) and self._entries[position] == (text, key):
+                del self._entries[position]
+
+    def search(self, prefix, limit=None):
+        """Keys with a field starting with prefix, at most limit of them."""
+        prefix = str(prefix).lower()
+        keys = {}
+        for position in range(bisect_left(self._entries, (prefix,)), len(self._entries)):
+            text, key = self._entries[position]
+            if not text.startswith(prefix) or (limit is not None and len(keys) >= limit):
+                break
+            keys[key] = None
+        return list(keys)
+
+    def clear(self):
+        self._entries = []
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GridIndex:
+    """
+    Spatial index of points on a fixed latitude/longitude grid. Each cell holds the keys of the points in it,
+    so area, radius and nearest-neighbour queries only look at the cells around the query point.
+    The default cell of 0.005 degrees is roughly 550 by 340 metres in Rotterdam.
+    """
+
+    def __init__(self, cell_size=0.005):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._points = {}
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, latitude, longitude):
+        return math.floor(latitude / self.cell_size), math.floor(longitude / self.cell_size)
+
+    def add(self, key, latitude, longitude):
+        self.remove(key)
+        self._points[key] = (latitude, longitude)
+        self._cells.setdefault(self._cell(latitude, longitude), set()).add(key)
+
+    def remove(self, key):
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        keys = self._cells[cell]
+        keys.discard(key)
+        if not keys:
+            del self._cells[cell]
+
+    def clear(self):
+        self._cells = {}
+        self._points = {}
+
+    def in_area(self, min_latitude, min_longitude, max_latitude, max_longitude):
+        """Keys of the points inside the bounding box, borders included."""
+        min_row, min_column = self._cell(min_latitude, min_longitude)
+        max_row, max_column = self._cell(max_latitude, max_longitude)
+        keys = []
+        for row in range(min_row, max_row + 1):
+            for column in range(min_column, max_column + 1):
+                for key in self._cells.get((row, column), ()):
+                    latitude, longitude = self._points[key]
+                    if min_latitude <= latitude <= max_latitude and min_longitude <= longitude <= max_longitude:
+                        keys.append(key)
+        return keys
+
+    def _degrees(self, latitude, distance_km):
+        """Latitude and longitude spans that cover distance_km around the given latitude."""
+        latitude_span = math.degrees(distance_km / EARTH_RADIUS_KM)
+        longitude_span = latitude_span / max(math.cos(math.radians(latitude)), 1e-6)
+        return latitude_span, longitude_span
+
+    def within_radius(self, latitude, longitude, radius_km):
+        """(distance_km, key) for every point within radius_km, nearest first."""
+        latitude_span, longitude_span = self._degrees(latitude, radius_km)
+        candidates = self.in_area(latitude - latitude_span, longitude - longitude_span,
+                                  latitude + latitude_span, longitude + longitude_span)
+        matches = [(haversine_km(latitude, longitude, *self._points[key]), key) for key in candidates]
+        return sorted(match for match in matches if match[0] <= radius_km)
+
+    def nearest(self, latitude, longitude, k, max_distance_km=None):
+        """
+        (distance_km, key) for the k points nearest to the query point, nearest first.
+        Searches rings of cells outwards from the query point and stops as soon as no unvisited cell
+        can hold a point closer than the k-th one found.
+        """
+        if k <= 0 or not self._points:
+            return []
+        center_row, center_column = self._cell(latitude, longitude)
+        # The smallest distance that one ring of cells is guaranteed to add.
+        ring_km = min(self.cell_size * math.pi / 180 * EARTH_RADIUS_KM,
+                      self.cell_size * math.pi / 180 * EARTH_RADIUS_KM * math.cos(math.radians(latitude)))
+        found = []
+        seen = 0
+        ring = 0
+        while seen < len(self._points):
+            if ring == 0:
+                cells = [(center_row, center_column)]
+            elif 8 * ring > len(self._cells):
+                # A ring would have more cells than there are occupied ones, so just measure every point.
+                found = [(haversine_km(latitude, longitude, *point), key) for key, point in self._points.items()]
+                break
+            else:
+                cells = [(center_row + d_row, center_column + d_column)
+                         for d_row in range(-ring, ring + 1)
+                         for d_column in range(-ring, ring + 1)
+                         if max(abs(d_row), abs(d_column)) == ring]
+            for cell in cells:
+                for key in self._cells.get(cell, ()):
+                    found.append((haversine_km(latitude, longitude, *self._points[key]), key))
+                    seen += 1
+            covered_km = ring * ring_km
+            if max_distance_km is not None and covered_km >= max_distance_km:
+                break
+            if len(found) >= k and heapq.nsmallest(k, found)[-1][0] <= covered_km:
+                break
+            ring += 1
+        found.sort()
+        if max_distance_km is not None:
+            found = [match for match in found if match[0] <= max_distance_km]
+        return found[:k]
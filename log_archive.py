@@ -0,0 +1,31 @@
+import json
+import os
+import zlib
+
+from file_utils import write_file_atomically
+
+# Archived log segments are stored here, one file per segment. Which segments exist, and the time range
+# and counts of each, is kept in the LogArchiveSegments table.
+ARCHIVE_DIR = "log_archive"
+SEGMENT_SUFFIX = ".seg"
+
+
+def segment_path(segment_id):
+    return os.path.join(ARCHIVE_DIR, f"{segment_id}{SEGMENT_SUFFIX}")
+
+
+def write_segment(security, segment_id, records):
+    """
+    Writes log records to a new segment file: serialized to JSON, compressed, then encrypted as a whole.
+    """
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    payload = zlib.compress(json.dumps(records, separators=(',', ':')).encode('utf-8'), 9)
+    path = segment_path(segment_id)
+    write_file_atomically(path, security.encrypt_bytes(payload))
+    return os.path.basename(path)
+
+
+def read_segment(security, file_name):
+    with open(os.path.join(ARCHIVE_DIR, file_name), 'rb') as f:
+        payload = security.decrypt_bytes(f.read())
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
@@ -0,0 +1,85 @@
+from bisect import bisect_right, insort
+
+
+class LogStore(dict):
+    """
+    In-memory Logs table: log records keyed by log_id, that also keeps them in timestamp order and
+    keeps running counts of unread and unread suspicious entries.
+    Read state is a watermark: every entry at or before read_mark, a (timestamp, log_id) key, counts as read.
+    Entries normally arrive in timestamp order and are appended; older entries are inserted in place.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._order = []
+        self.read_mark = None
+        self.unread_count = 0
+        self.unread_suspicious_count = 0
+
+    @staticmethod
+    def sort_key(record):
+        return record['timestamp'], record['log_id']
+
+    def _count(self, record, sign):
+        if self.read_mark is None or self.sort_key(record) > self.read_mark:
+            self.unread_count += sign
+            if record['is_suspicious'] == 1:
+                self.unread_suspicious_count += sign
+
+    def _forget(self, record):
+        key = self.sort_key(record)
+        position = bisect_right(self._order, key) - 1
+        if position >= 0 and self._order[position] == key:
+            del self._order[position]
+        self._count(record, -1)
+
+    def __setitem__(self, log_id, record):
+        existing = self.get(log_id)
+        if existing is not None:
+            self._forget(existing)
+        key = self.sort_key(record)
+        if not self._order or self._order[-1] <= key:
+            self._order.append(key)
+        else:
+            insort(self._order, key)
+        self._count(record, 1)
+        super().__setitem__(log_id, record)
+
+    def __delitem__(self, log_id):
+        self._forget(self[log_id])
+        super().__delitem__(log_id)
+
+    def pop(self, log_id, *default):
+        if log_id not in self:
+            return super().pop(log_id, *default)
+        record = self[log_id]
+        del self[log_id]
+        return record
+
+    def clear(self):
+        super().clear()
+        self._order = []
+        self.unread_count = 0
+        self.unread_suspicious_count = 0
+
+    def newest_first(self):
+        """All records, most recent first."""
+        return [self[log_id] for _, log_id in reversed(self._order)]
+
+    def set_read_mark(self, read_mark):
+        """Moves the watermark and recounts the entries after it, newest first."""
+        self.read_mark = read_mark
+        self.unread_count = 0
+        self.unread_suspicious_count = 0
+        for key in reversed(self._order):
+            if read_mark is not None and key <= read_mark:
+                break
+            self._count(self[key[1]], 1)
+
+    def mark_all_read(self):
+        """Moves the watermark to the newest entry and returns it (None while the store is empty)."""
+        if self._order:
+            self.read_mark = self._order[-1]
+        self.unread_count = 0
+        self.unread_suspicious_count = 0
+        return self.read_mark
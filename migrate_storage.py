@@ -0,0 +1,15 @@
+import sys
+import database
+import data_access
+
+
+if __name__ == '__main__':
+    mode = sys.argv[1] if len(sys.argv) > 1 else 'row'
+    if mode not in database.RECORD_TABLE_SCHEMAS:
+        print(f"Usage: python migrate_storage.py [{'|'.join(database.RECORD_TABLE_SCHEMAS)}]")
+        sys.exit(1)
+
+    print(f"Converting traveller and scooter records to '{mode}' storage...")
+    database.initialize_database()
+    data_access.DataAccess().convert_record_storage(mode)
+    print("Conversion completed.")
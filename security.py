@@ -1,14 +1,65 @@
 import os
+import hmac
+import hashlib
+import multiprocessing
 import bcrypt
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from cryptography.fernet import Fernet, InvalidToken
 
 KEY_FILE = "secret.key"
 
+# Bulk encryption settings used by encrypt_many and decrypt_many.
+# 'thread' avoids process start-up and pickling costs; 'process' spreads the work over all cores. Worker
+# processes are spawned, not forked, since the app already runs threads (audit writer, backups) by then.
+# Batches smaller than two chunks are handled in the calling thread.
+CRYPTO_EXECUTOR = 'thread'
+CRYPTO_WORKERS = os.cpu_count() or 1
+CRYPTO_CHUNK_SIZE = 1000
+
+
+def _encrypt_with(fernet, data):
+    if not isinstance(data, str) or not data:
+        return None
+    return fernet.encrypt(data.encode('utf-8'))
+
+
+def _decrypt_with(fernet, encrypted_data):
+    if not isinstance(encrypted_data, bytes):
+        return None
+    try:
+        return fernet.decrypt(encrypted_data).decode('utf-8')
+    except InvalidToken:
+        print("Error: Decryption failed. The data may be corrupt or tampered with.")
+        return None
+
+
+# Each worker process builds its own Fernet instance from the key once, in _init_worker.
+_worker_fernet = None
+
+
+def _init_worker(key):
+    global _worker_fernet
+    _worker_fernet = Fernet(key)
+
+
+def _encrypt_chunk(values, fernet=None):
+    fernet = fernet or _worker_fernet
+    return [_encrypt_with(fernet, value) for value in values]
+
+
+def _decrypt_chunk(values, fernet=None):
+    fernet = fernet or _worker_fernet
+    return [_decrypt_with(fernet, value) for value in values]
+
+
 class SecurityManager:
     def __init__(self, key_file=KEY_FILE):
         self.key_file = key_file
         self.key = self._load_or_generate_key()
         self.fernet = Fernet(self.key)
+        self._executor = None
+        # Separate key for blind indexes, derived from the main key so no extra key file is needed.
+        self.blind_index_key = hmac.new(self.key, b"urban-mobility-blind-index", hashlib.sha256).digest()
 
     def _load_or_generate_key(self):
         if os.path.exists(self.key_file):
@@ -24,19 +75,61 @@ class SecurityManager:
         return key
 
     def encrypt_data(self, data):
-        if not isinstance(data, str) or not data:
-            return None
-        return self.fernet.encrypt(data.encode('utf-8'))
+        return _encrypt_with(self.fernet, data)
 
     def decrypt_data(self, encrypted_data):
-        if not isinstance(encrypted_data, bytes):
-            return None
-        try:
-            decrypted_bytes = self.fernet.decrypt(encrypted_data)
-            return decrypted_bytes.decode('utf-8')
-        except InvalidToken:
-            print("Error: Decryption failed. The data may be corrupt or tampered with.")
+        return _decrypt_with(self.fernet, encrypted_data)
+
+    def encrypt_bytes(self, data):
+        return self.fernet.encrypt(data)
+
+    def decrypt_bytes(self, encrypted_data):
+        """Like decrypt_data, for binary payloads. Raises InvalidToken instead of returning None."""
+        return self.fernet.decrypt(encrypted_data)
+
+    def _get_executor(self):
+        if self._executor is None:
+            if CRYPTO_EXECUTOR == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=CRYPTO_WORKERS,
+                                                     mp_context=multiprocessing.get_context('spawn'),
+                                                     initializer=_init_worker, initargs=(self.key,))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=CRYPTO_WORKERS)
+        return self._executor
+
+    def _run_batch(self, chunk_function, values, chunk_size):
+        values = list(values)
+        chunk_size = chunk_size or CRYPTO_CHUNK_SIZE
+        if CRYPTO_WORKERS <= 1 or len(values) < chunk_size * 2:
+            return chunk_function(values, self.fernet)
+
+        chunks = [values[i:i + chunk_size] for i in range(0, len(values), chunk_size)]
+        executor = self._get_executor()
+        if CRYPTO_EXECUTOR == 'process':
+            results = executor.map(chunk_function, chunks)
+        else:
+            results = executor.map(chunk_function, chunks, [self.fernet] * len(chunks))
+        return [value for chunk in results for value in chunk]
+
+    def encrypt_many(self, values, chunk_size=None):
+        """Encrypts many strings at once, spread over the worker pool. Results keep the input order."""
+        return self._run_batch(_encrypt_chunk, values, chunk_size)
+
+    def decrypt_many(self, encrypted_values, chunk_size=None):
+        """Decrypts many tokens at once, spread over the worker pool. Results keep the input order."""
+        return self._run_batch(_decrypt_chunk, encrypted_values, chunk_size)
+
+    def shutdown_workers(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def blind_index(self, data):
+        """Deterministic keyed hash of a value, used to look up encrypted columns by equality."""
+        if not isinstance(data, str) or not data.strip():
             return None
+        normalized = data.strip().lower().encode('utf-8')
+        return hmac.new(self.blind_index_key, normalized, hashlib.sha256).hexdigest()
 
     def hash_password(self, password):
         password_bytes = password.encode('utf-8')
@@ -1,11 +1,15 @@
 import data_access as da
+from data_access import RECORD_FIELDS, TABLE_KEYS
 from models import Traveller, Scooter, User, RestoreCode
 from datetime import datetime, timedelta
 from security import SecurityManager
 from auditing import audit_activity
 from database import DATABASE_NAME
 import authorization
-import zipfile
+import backup
+import validators
+import csv
+import json
 import os
 import shutil
 import secrets
@@ -13,6 +17,34 @@ import secrets
 security = SecurityManager()
 da = da.DataAccess()
 
+# Columns of a traveller import file and how each is validated, and how many rows are inserted per transaction.
+TRAVELLER_IMPORT_VALIDATORS = {
+    'first_name': validators.is_valid_name,
+    'last_name': validators.is_valid_name,
+    'birthday': validators.is_valid_birth_date,
+    'gender': validators.is_valid_gender,
+    'street_name': validators.is_valid_address_field,
+    'house_number': validators.is_valid_house_number,
+    'zip_code': validators.is_valid_zip_code,
+    'city': validators.is_valid_city,
+    'email_address': validators.is_valid_email,
+    'mobile_phone': validators.is_valid_mobile_phone,
+    'driving_license_number': validators.is_valid_driving_license
+}
+TRAVELLER_IMPORT_CHUNK_SIZE = 1000
+
+# The backup currently running or last run, see start_backup, and who started it while its result is not logged yet.
+_backup_job = None
+_backup_username = None
+
+# Tables that can be exported, and the formats they can be exported in.
+EXPORT_TABLES = {'travellers': RECORD_FIELDS['travellers'], 'scooters': RECORD_FIELDS['scooters']}
+EXPORT_FORMATS = ('csv', 'jsonl')
+EXPORT_DIR = "exports"
+
+# Fields of a telemetry reading, in the order of a (scooter_id, soc, latitude, longitude, mileage) tuple.
+TELEMETRY_FIELDS = ('soc_percentage', 'location_latitude', 'location_longitude', 'mileage_km')
+
 
 @audit_activity("ADD_TRAVELLER", "Added new traveller account", "Failed to add new traveller")
 def add_new_traveller(data, current_user):
@@ -23,6 +55,9 @@ def add_new_traveller(data, current_user):
                                       house_number=data['house_number'], zip_code=data['zip_code'], city=data['city'],
                                       email_address=data['email_address'], mobile_phone=data['mobile_phone'],
                                       driving_license_number=data['driving_license_number'])
+            if da.find_traveller_by_email(traveller_obj.email_address) is not None:
+                print("Error: A traveller with this email address already exists.")
+                return None
             print(f"Adding new traveller: {traveller_obj.first_name} {traveller_obj.last_name}")
             traveller_id = da.add_traveller(traveller_obj)
             if traveller_id:
@@ -39,6 +74,85 @@ def add_new_traveller(data, current_user):
     return None
 
 
+def _validate_traveller_row(row):
+    """The problems with one row of a traveller import file, as (column, message) pairs."""
+    errors = []
+    for field, validator in TRAVELLER_IMPORT_VALIDATORS.items():
+        value = (row.get(field) or '').strip()
+        if not value:
+            errors.append((field, "This field is required."))
+            continue
+        is_valid, message = validator(value)
+        if not is_valid:
+            errors.append((field, message))
+    return errors
+
+
+def import_travellers_from_csv(file_path, current_user):
+    """
+    Adds every valid row of a CSV file with a header row naming the TRAVELLER_IMPORT_VALIDATORS columns.
+    The file is read as a stream and inserted TRAVELLER_IMPORT_CHUNK_SIZE rows per transaction. Rows that fail
+    validation or insertion are listed in an error report next to the input file. Writes one log entry for the import.
+    Returns a summary dict, or None when the file cannot be read.
+    """
+    if authorization.has_permission(current_user.role, 'add_traveller') is not True:
+        print("Error: Permission denied.")
+        return None
+
+    imported = 0
+    errors = []
+    seen_emails = set()
+
+    def insert(chunk):
+        results = da.add_travellers([traveller for _, traveller in chunk])
+        for (line_number, _), (customer_id, error) in zip(chunk, results):
+            if customer_id is None:
+                errors.append((line_number, 'email_address', error))
+        return sum(1 for customer_id, _ in results if customer_id is not None)
+
+    try:
+        with open(file_path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            missing = [field for field in TRAVELLER_IMPORT_VALIDATORS if field not in (reader.fieldnames or ())]
+            if missing:
+                print(f"Error: The file is missing the column(s): {', '.join(missing)}")
+                return None
+
+            chunk = []
+            for row in reader:
+                row_errors = _validate_traveller_row(row)
+                email = (row.get('email_address') or '').strip().lower()
+                if not row_errors and email in seen_emails:
+                    row_errors.append(('email_address', "The email address appears earlier in the file."))
+                if row_errors:
+                    errors.extend((reader.line_num, field, message) for field, message in row_errors)
+                    continue
+                seen_emails.add(email)
+                data = {field: row[field].strip() for field in TRAVELLER_IMPORT_VALIDATORS}
+                chunk.append((reader.line_num, Traveller(customer_id=None, **data)))
+                if len(chunk) >= TRAVELLER_IMPORT_CHUNK_SIZE:
+                    imported += insert(chunk)
+                    chunk = []
+            if chunk:
+                imported += insert(chunk)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        print(f"Error: Could not read the import file: {e}")
+        return None
+
+    report_path = None
+    if errors:
+        report_path = f"{os.path.splitext(file_path)[0]}_import_errors.csv"
+        with open(report_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['line', 'column', 'error'])
+            writer.writerows(sorted(errors))
+
+    failed_lines = len({line_number for line_number, _, _ in errors})
+    da.add_log_entry(current_user.username, "IMPORT_TRAVELLERS",
+                     f"Imported {imported} travellers from '{os.path.basename(file_path)}', {failed_lines} rows rejected")
+    return {'imported': imported, 'rejected': failed_lines, 'errors': len(errors), 'report_path': report_path}
+
+
 def search_travellers_by_name_or_id(traveller_query, current_user):
     if authorization.has_permission(current_user.role, 'search_travellers') is True:
         da.add_log_entry(current_user.username, "SEARCH_TRAVELLER", f"Searched for: '{traveller_query}'")
@@ -60,6 +174,10 @@ def get_traveller_details(traveller_id, current_user):
 @audit_activity("UPDATE_TRAVELLER", "Updated traveller account details", "Failed to update traveller details")
 def update_traveller_details(traveller_obj, current_user):
     if authorization.has_permission(current_user.role, 'update_traveller') is True:
+        existing = da.find_traveller_by_email(traveller_obj.email_address)
+        if existing is not None and existing.customer_id != traveller_obj.customer_id:
+            print("Error: A traveller with this email address already exists.")
+            return False
         return da.update_traveller(traveller_obj)
 
     print("Error: Permission denied.")
@@ -258,6 +376,9 @@ def add_new_scooter(data, current_user):
     if authorization.has_permission(current_user.role, 'add_scooter') is True:
         try:
             scooter_obj = Scooter(**data)
+            if da.find_scooter_by_serial_number(scooter_obj.serial_number) is not None:
+                print("Error: A scooter with this serial number already exists.")
+                return None
             scooter_id = da.add_scooter(scooter_obj)
             if scooter_id:
                 print(f"Successfully added scooter. New Scooter ID: {scooter_id}")
@@ -273,15 +394,97 @@ def add_new_scooter(data, current_user):
     return None
 
 
-def search_scooters(query, current_user):
+def search_scooters(query, current_user, limit=None):
+    """Scooters matching query, all of them unless a limit is given. A query ending in '*' matches on prefixes."""
     if authorization.has_permission(current_user.role, 'search_scooters') is True:
         da.add_log_entry(current_user.username, "SEARCH_SCOOTER", f"Searched for scooters with query: '{query}'")
-        return da.search_scooters(query)
+        if query.endswith('*'):
+            return da.search_scooters(query[:-1], limit=limit, prefix=True)
+        return da.search_scooters(query, limit=limit)
+
+    print("Error: Permission denied.")
+    return []
+
+
+def find_nearby_scooters(latitude, longitude, current_user, radius_km=None, limit=10):
+    """The scooters nearest to a location, optionally only those within radius_km, nearest first."""
+    if authorization.has_permission(current_user.role, 'search_scooters') is True:
+        da.add_log_entry(current_user.username, "SEARCH_SCOOTER_NEARBY",
+                         f"Searched for scooters near ({latitude}, {longitude})"
+                         + (f" within {radius_km} km" if radius_km else ""))
+        return da.find_nearest_scooters(latitude, longitude, limit=limit, max_distance_km=radius_km)
 
     print("Error: Permission denied.")
     return []
 
 
+def _validate_telemetry_value(field, value):
+    """The value of a reading as it is stored, and an error message naming the field, or None."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None, f"{field}: must be a number."
+    if field == 'soc_percentage':
+        value = round(value, 2)
+        is_valid, message = validators.is_valid_soc(f"{value:.2f}".rstrip('0').rstrip('.'))
+    elif field == 'mileage_km':
+        value = round(value, 2)
+        is_valid, message = validators.is_valid_mileage(f"{value:.2f}".rstrip('0').rstrip('.'))
+    else:
+        value = round(value, 5)
+        is_valid, message = validators.validate_rotterdam_coordinates(
+            f"{value:.5f}", 'latitude' if field == 'location_latitude' else 'longitude')
+    return value, None if is_valid else f"{field}: {message}"
+
+
+def ingest_scooter_telemetry(readings, current_user):
+    """
+    Applies a batch of (scooter_id, soc, latitude, longitude, mileage) readings; a None value leaves that field as is.
+    Readings are validated, and when a scooter has several the later ones win, field by field. Only changed
+    fields are written, in one transaction, and the batch gets a single log entry.
+    Returns a summary dict with the (reading index, message) of every rejected reading.
+    """
+    if authorization.has_permission(current_user.role, 'update_scooter_limited') is not True:
+        print("Error: Permission denied.")
+        return None
+
+    updates = {}
+    errors = []
+    received = 0
+    for index, reading in enumerate(readings):
+        received += 1
+        try:
+            scooter_id, *values = reading
+        except (TypeError, ValueError):
+            errors.append((index, "A reading must be (scooter_id, soc, latitude, longitude, mileage)."))
+            continue
+        if len(values) != len(TELEMETRY_FIELDS):
+            errors.append((index, "A reading must be (scooter_id, soc, latitude, longitude, mileage)."))
+            continue
+        if not isinstance(scooter_id, (str, int)) or isinstance(scooter_id, bool):
+            errors.append((index, "scooter_id: must be a string or an integer."))
+            continue
+        fields = {}
+        for field, value in zip(TELEMETRY_FIELDS, values):
+            if value is None:
+                continue
+            value, message = _validate_telemetry_value(field, value)
+            if message:
+                errors.append((index, message))
+                break
+            fields[field] = value
+        else:
+            updates.setdefault(scooter_id, {}).update(fields)
+
+    updated, unknown = da.update_scooter_telemetry(updates) if updates else ([], [])
+    da.add_log_entry(current_user.username, "INGEST_TELEMETRY",
+                     f"Telemetry batch: {received} readings for {len(updates)} scooters, "
+                     f"{len(updated)} scooters changed, {len(errors)} readings rejected, "
+                     f"{len(unknown)} unknown scooters")
+    return {'received': received, 'rejected': len(errors), 'errors': errors, 'scooters_updated': len(updated),
+            'unknown_scooters': unknown}
+
+
 def get_scooter_details(scooter_id, current_user):
     if authorization.has_permission(current_user.role, 'view_scooter_details') is True:
         da.add_log_entry(current_user.username, "VIEW_SCOOTER", f"Viewed details for scooter ID: {scooter_id}")
@@ -295,6 +498,10 @@ def get_scooter_details(scooter_id, current_user):
 def update_scooter_details(scooter_obj, current_user, is_limited=False):
     required_permission = 'update_scooter_limited' if is_limited else 'update_scooter_full'
     if authorization.has_permission(current_user.role, required_permission) is True:
+        existing = da.find_scooter_by_serial_number(scooter_obj.serial_number)
+        if existing is not None and existing.scooter_id != scooter_obj.scooter_id:
+            print("Error: A scooter with this serial number already exists.")
+            return False
         return da.update_scooter(scooter_obj)
 
     print("Error: Permission denied.")
@@ -310,12 +517,96 @@ def delete_scooter_record(scooter_id, current_user):
     return False
 
 
+def get_fleet_report(current_user):
+    if authorization.has_permission(current_user.role, 'view_fleet_report') is True:
+        da.add_log_entry(current_user.username, "VIEW_FLEET_REPORT", "Fleet report was viewed.")
+        return da.get_fleet_report()
+
+    print("Error: Permission denied.")
+    return None
+
+
+def export_records(table, current_user, file_format='csv', fields=None, file_path=None):
+    """
+    Writes the decrypted records of the travellers or scooters table to a CSV or JSONL file, by default in
+    EXPORT_DIR. Records are streamed from the database chunk by chunk, so memory use does not grow with the table.
+    fields selects and orders the columns; the primary key always comes first. The export gets one log entry.
+    Returns (file path, record count), or None.
+    """
+    if authorization.has_permission(current_user.role, 'export_data') is not True:
+        print("Error: Permission denied.")
+        return None
+    if table not in EXPORT_TABLES or file_format not in EXPORT_FORMATS:
+        print("Error: Unknown table or export format.")
+        return None
+    fields = list(fields or EXPORT_TABLES[table])
+    unknown = [field for field in fields if field not in EXPORT_TABLES[table]]
+    if unknown:
+        print(f"Error: Unknown column(s) for {table}: {', '.join(unknown)}")
+        return None
+
+    if file_path is None:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        file_path = os.path.join(EXPORT_DIR, f"{table}_{timestamp}.{file_format}")
+
+    count = 0
+    try:
+        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = None
+            for records in da.stream_records(table, fields):
+                if file_format == 'csv':
+                    if writer is None:
+                        writer = csv.DictWriter(f, fieldnames=list(records[0]))
+                        writer.writeheader()
+                    writer.writerows(records)
+                else:
+                    f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+                count += len(records)
+            if writer is None and file_format == 'csv':
+                csv.writer(f).writerow([TABLE_KEYS[table], *fields])
+    except (OSError, ConnectionError) as e:
+        print(f"An error occurred during the export: {e}")
+        da.add_log_entry(current_user.username, "EXPORT_DATA_FAIL", f"Export of {table} failed",
+                         additional_info=f"columns: {', '.join(fields)}")
+        return None
+
+    da.add_log_entry(current_user.username, "EXPORT_DATA_SUCCESS",
+                     f"Exported {count} {table} records to '{os.path.basename(file_path)}'",
+                     additional_info=f"columns: {', '.join(fields)}")
+    return file_path, count
+
+
 def view_system_logs(current_user):
+    """Opens the log viewer: returns the first page of logs and the cursor of the next one, see get_system_logs_page."""
     if authorization.has_permission(current_user.role, 'view_system_logs') is True:
         da.add_log_entry(current_user.username, "VIEW_LOGS", "System logs were viewed.")
-        logs = da.get_all_logs()
-        da.mark_all_logs_as_read()
-        return logs
+        logs, next_cursor = da.get_logs_page()
+        if logs:
+            da.mark_all_logs_as_read(newest_log=logs[0])
+        return logs, next_cursor
+
+    print("Error: Permission denied.")
+    return [], None
+
+
+def get_system_logs_page(current_user, before=None):
+    if authorization.has_permission(current_user.role, 'view_system_logs') is True:
+        return da.get_logs_page(before)
+
+    print("Error: Permission denied.")
+    return [], None
+
+
+def view_archived_logs(current_user, start_date=None, end_date=None):
+    """Archived logs between two YYYY-MM-DD dates, both inclusive and optional, newest first."""
+    if authorization.has_permission(current_user.role, 'view_system_logs') is True:
+        da.add_log_entry(current_user.username, "VIEW_ARCHIVED_LOGS",
+                         f"Archived logs were viewed from {start_date or 'the beginning'} to {end_date or 'now'}.")
+        end = None
+        if end_date:
+            end = (datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)).isoformat()
+        return da.get_archived_logs(start=start_date or None, end=end)
 
     print("Error: Permission denied.")
     return []
@@ -330,41 +621,82 @@ def check_for_suspicious_activity(current_user):
     return 0
 
 
-@audit_activity("CREATE_BACKUP", "Backup created: {result}", "Backup creation failed.")
-def create_backup(current_user):
+def record_backup_result():
+    """
+    Logs the result of the last backup once it has finished, and returns its job; None when there is nothing to log.
+    The backup thread does not write the log itself, so the UI calls this from the main thread.
+    """
+    global _backup_username
+    job = _backup_job
+    if job is None or _backup_username is None or job.is_running():
+        return None
+    username, _backup_username = _backup_username, None
+    if job.state == 'done':
+        da.add_log_entry(username, "CREATE_BACKUP_SUCCESS", f"Backup created: {job.backup_file}")
+    else:
+        da.add_log_entry(username, "CREATE_BACKUP_FAIL", "Backup creation failed.", additional_info=str(job.error))
+    return job
+
+
+def start_backup(current_user, codec=None, level=None):
+    """
+    Starts a backup on a background thread and returns its BackupJob, or the job that is already running.
+    codec and level choose the compression of new chunks, see backup.CODECS. Its result is logged by
+    record_backup_result.
+    """
+    global _backup_job, _backup_username
     if authorization.has_permission(current_user.role, 'create_backup') is True:
-        backup_dir = "backups"
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
-
-        db_file = DATABASE_NAME
-        if not os.path.exists(db_file):
-            print(f"Error: Database file '{db_file}' not found.")
+        if _backup_job is not None and _backup_job.is_running():
+            return _backup_job
+        record_backup_result()
+        if not os.path.exists(DATABASE_NAME):
+            print(f"Error: Database file '{DATABASE_NAME}' not found.")
+            da.add_log_entry(current_user.username, "CREATE_BACKUP_FAIL", "Backup creation failed.",
+                             additional_info=f"Database file '{DATABASE_NAME}' not found.")
             return None
-
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_filename = os.path.join(backup_dir, f"backup_{timestamp}.zip")
-
         try:
-            with zipfile.ZipFile(backup_filename, 'w', zipfile.ZIP_DEFLATED) as zf:
-                zf.write(db_file, os.path.basename(db_file))
-            print(f"Successfully created backup: {backup_filename}")
-            return backup_filename
-        except Exception as e:
-            print(f"An error occurred during backup creation: {e}")
+            _backup_job = backup.BackupJob(before_snapshot=da.flush_audit_log, codec=codec, level=level)
+        except ValueError as e:
+            print(f"Error: {e}")
+            da.add_log_entry(current_user.username, "CREATE_BACKUP_FAIL", "Backup creation failed.",
+                             additional_info=str(e))
             return None
+        _backup_username = current_user.username
+        return _backup_job.start()
 
     print("Error: Permission denied.")
+    da.add_log_entry(current_user.username, "CREATE_BACKUP_FAIL", "Backup creation failed.",
+                     additional_info="Permission denied.", is_suspicious=1)
     return None
 
 
+def get_backup_job():
+    """The most recently started backup job, or None."""
+    return _backup_job
+
+
+def create_backup(current_user, codec=None, level=None):
+    """Creates a backup and waits for it; returns the backup file, or None."""
+    job = start_backup(current_user, codec, level)
+    if job is None:
+        return None
+    job.wait()
+    record_backup_result()
+    if job.backup_file:
+        print(f"Successfully created backup: {job.backup_file}")
+    else:
+        print(f"An error occurred during backup creation: {job.error}")
+    return job.backup_file
+
+
 def list_backups(current_user):
     if authorization.has_permission(current_user.role, 'restore_backup') is True:
-        backup_dir = "backups"
+        backup_dir = backup.BACKUP_DIR
         if not os.path.exists(backup_dir):
             return []
 
-        backups = [f for f in os.listdir(backup_dir) if f.endswith('.zip') and f.startswith('backup_')]
+        backups = [f for f in os.listdir(backup_dir) if f.startswith('backup_')
+                   and f.endswith((backup.MANIFEST_SUFFIX, backup.LEGACY_SUFFIX))]
         return sorted(backups, reverse=True)
 
     print("Error: Permission denied.")
@@ -376,20 +708,27 @@ def list_backups(current_user):
 def restore_from_backup(backup_file, current_user, restore_code_obj=None):
     if authorization.has_permission(current_user.role, 'restore_backup') is True:
 
-        backup_dir = "backups"
+        backup_dir = backup.BACKUP_DIR
         backup_path = os.path.join(backup_dir, backup_file)
         db_file = DATABASE_NAME
 
         if not os.path.exists(backup_path):
             return False, f"Backup file '{backup_path}' not found."
+        if _backup_job is not None and _backup_job.is_running():
+            return False, "A backup is being created. Try again when it has finished."
 
         temp_backup_db = db_file + ".temp_restore_bak"
+        restored_db = db_file + ".temp_restore"
         try:
+            da.checkpoint()
+            da.close_connections()
             if os.path.exists(db_file):
                 shutil.copy2(db_file, temp_backup_db)
 
-            with zipfile.ZipFile(backup_path, 'r') as zf:
-                zf.extract(os.path.basename(db_file), path=".")
+            backup.restore_to(backup_path, restored_db)
+            os.replace(restored_db, db_file)
+            # The in-memory store still holds the data of the replaced file.
+            da.unload_all_tables()
 
             if os.path.exists(temp_backup_db):
                 os.remove(temp_backup_db)
@@ -400,6 +739,8 @@ def restore_from_backup(backup_file, current_user, restore_code_obj=None):
             return True, f"Database successfully restored from {backup_file}."
 
         except Exception as e:
+            if os.path.exists(restored_db):
+                os.remove(restored_db)
             if os.path.exists(temp_backup_db):
                 shutil.move(temp_backup_db, db_file)
             return False, f"A critical error occurred during restore: {e}"
@@ -40,6 +40,7 @@ if __name__ == '__main__':
     print("Initializing database...")
     database.initialize_database()
     data_access = data_access.DataAccess()
+    data_access.backfill_blind_indexes()
 
     create_super_admin_if_not_exists(data_access)
 
@@ -0,0 +1,135 @@
+import numpy as np
+
+# Numeric scooter fields mirrored as typed columns. Missing or unparsable values are NaN.
+NUMERIC_FIELDS = ('top_speed_kmh', 'battery_capacity_wh', 'soc_percentage', 'target_soc_min', 'target_soc_max',
+                  'location_latitude', 'location_longitude', 'mileage_km')
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_date(value):
+    try:
+        return np.datetime64(value, 'D')
+    except (TypeError, ValueError):
+        return np.datetime64('NaT')
+
+
+class ScooterTelemetry:
+    """
+    Columnar, typed mirror of the in-memory Scooters table: one NumPy array per numeric field plus
+    out_of_service and last_maintenance_date, a model_group column numbering the (brand, model) pairs,
+    and a scooter_id -> row map, so fleet-wide filters are a few vectorized comparisons instead of a float()
+    per field per scooter.
+
+    Rows 0..len-1 are live. A removed row is filled with the last row, so row order is arbitrary;
+    the arrays grow by doubling. version changes with every change, for caching results computed from the store.
+    """
+
+    def __init__(self, capacity=1024):
+        self._rows = {}
+        self._keys = np.empty(capacity, dtype=object)
+        self._columns = {field: np.full(capacity, np.nan) for field in NUMERIC_FIELDS}
+        self._columns['out_of_service'] = np.zeros(capacity, dtype=bool)
+        self._columns['model_group'] = np.zeros(capacity, dtype=np.int32)
+        self._columns['last_maintenance_date'] = np.full(capacity, np.datetime64('NaT'), dtype='datetime64[D]')
+        self._size = 0
+        self.version = 0
+        # (brand, model) of every model_group number; numbers are never reused.
+        self.model_groups = []
+        self._model_group_ids = {}
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def _grow(self):
+        capacity = 2 * len(self._keys)
+        keys = np.empty(capacity, dtype=object)
+        keys[:self._size] = self._keys[:self._size]
+        self._keys = keys
+        for field, values in self._columns.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[field] = grown
+
+    def add(self, key, record):
+        """Adds a scooter record, or overwrites the row of one that is already in the store."""
+        row = self._rows.get(key)
+        if row is None:
+            if self._size == len(self._keys):
+                self._grow()
+            row = self._rows[key] = self._size
+            self._keys[row] = key
+            self._size += 1
+        for field in NUMERIC_FIELDS:
+            self._columns[field][row] = _to_float(record.get(field))
+        self._columns['out_of_service'][row] = str(record.get('out_of_service')) in ('1', 'True')
+        model = (record.get('brand') or '', record.get('model') or '')
+        group = self._model_group_ids.get(model)
+        if group is None:
+            group = self._model_group_ids[model] = len(self.model_groups)
+            self.model_groups.append(model)
+        self._columns['model_group'][row] = group
+        self._columns['last_maintenance_date'][row] = _to_date(record.get('last_maintenance_date'))
+        self.version += 1
+
+    def remove(self, key):
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        last = self._size - 1
+        if row != last:
+            moved = self._keys[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+            for values in self._columns.values():
+                values[row] = values[last]
+        self._keys[last] = None
+        self._size = last
+        self.version += 1
+
+    def clear(self):
+        self._rows = {}
+        self._keys[:] = None
+        self._size = 0
+        self.version += 1
+
+    def column(self, field):
+        """The live values of a column. This is a view: do not keep it across changes to the store."""
+        return self._columns[field][:self._size]
+
+    def keys(self, mask=None):
+        """The scooter_ids of the rows selected by a boolean mask or an array of row numbers, or of all rows."""
+        keys = self._keys[:self._size]
+        return list(keys if mask is None else keys[mask])
+
+    def all_rows(self):
+        return np.ones(self._size, dtype=bool)
+
+    def between(self, field, low=None, high=None):
+        """Mask of the rows with low <= field <= high; a missing bound is open. NaN never matches."""
+        values = self.column(field)
+        mask = ~np.isnan(values)
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+        return mask
+
+    def in_area(self, min_latitude, min_longitude, max_latitude, max_longitude):
+        return (self.between('location_latitude', min_latitude, max_latitude)
+                & self.between('location_longitude', min_longitude, max_longitude))
+
+    def needs_charging(self):
+        """Mask of the scooters whose state of charge is below their target minimum."""
+        return self.column('soc_percentage') < self.column('target_soc_min')
+
+    def in_service(self):
+        return ~self.column('out_of_service')
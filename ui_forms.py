@@ -74,6 +74,21 @@ def ui_add_traveller(user):
     input("\nPress Enter to return to the menu...")
 
 
+def ui_import_travellers(user):
+    display_header("Import Travellers from CSV")
+    print("The file needs a header row with the columns: " + ", ".join(services.TRAVELLER_IMPORT_VALIDATORS))
+    file_path = get_input("Path to the CSV file (leave empty to cancel)", required=False)
+    if not file_path:
+        return
+    print("\nImporting travellers...")
+    summary = services.import_travellers_from_csv(file_path, user)
+    if summary is not None:
+        print(f"\nImported {summary['imported']} travellers; {summary['rejected']} rows were rejected.")
+        if summary['report_path']:
+            print(f"The problems found are listed in: {summary['report_path']}")
+    input("\nPress Enter to return to the menu...")
+
+
 def ui_search_travellers(user):
     display_header("Search for Traveller")
 
@@ -569,7 +584,7 @@ def ui_add_scooter(user):
 def ui_search_scooters(user):
     display_header("Search for Scooter")
     selected = _search_and_select_item(
-        search_prompt="Enter brand, model, or serial number to search",
+        search_prompt="Enter brand, model, or serial number to search (end with * to match the start only)",
         search_function=services.search_scooters,
         current_user=user,
         result_formatter=lambda r: {'display': f"{r['brand']} {r['model']} (SN: {r['serial_number']})",
@@ -587,10 +602,80 @@ def ui_search_scooters(user):
     input("\nPress Enter to return...")
 
 
+def ui_find_nearby_scooters(user):
+    display_header("Find Scooters Near a Location")
+    latitude = get_validated_input("Latitude (e.g., 51.92250)",
+                                   lambda value: validators.validate_rotterdam_coordinates(value, 'latitude'))
+    longitude = get_validated_input("Longitude (e.g., 4.47917)",
+                                    lambda value: validators.validate_rotterdam_coordinates(value, 'longitude'))
+    radius = get_validated_input("Maximum distance in km (leave empty for no limit)", validators.is_valid_float,
+                                 required=False)
+
+    results = services.find_nearby_scooters(float(latitude), float(longitude), user,
+                                            radius_km=float(radius) if radius else None, limit=10)
+    if not results:
+        print("\nNo scooters found near this location.")
+    else:
+        print()
+        for index, scooter in enumerate(results):
+            status = "Out of Service" if scooter['out_of_service'] == '1' else "In Service"
+            print(f"  [{index + 1}] {scooter['distance_km']:.2f} km - {scooter['brand']} {scooter['model']} "
+                  f"(SN: {scooter['serial_number']}) - SoC: {scooter['soc_percentage']}% - {status}")
+    input("\nPress Enter to return...")
+
+
+def _format_stats(stats, unit=""):
+    if stats is None:
+        return "n/a"
+    return (f"avg {stats['mean']:.1f}{unit}, p10 {stats['p10']:.1f}{unit}, "
+            f"median {stats['p50']:.1f}{unit}, p90 {stats['p90']:.1f}{unit}")
+
+
+def ui_view_fleet_report(user):
+    display_header("Fleet Report")
+    report = services.get_fleet_report(user)
+    if report is None:
+        input("\nPress Enter to return...")
+        return
+    if not report['total']:
+        print("There are no scooters in the fleet.")
+        input("\nPress Enter to return...")
+        return
+
+    print(f"Scooters: {report['total']} ({report['out_of_service']} out of service, "
+          f"{report['out_of_service_share']:.1%})")
+    print(f"In service below their minimum target SoC: {report['needs_charging']}")
+    print(f"State of charge: {_format_stats(report['soc'], '%')}")
+    print(f"Mileage: {_format_stats(report['mileage'], ' km')}")
+
+    print("\nBy brand and model:")
+    for group in report['by_model']:
+        print(f"  {group['brand']} {group['model']}: {group['count']} scooters, "
+              f"{group['out_of_service_share']:.1%} out of service")
+        print(f"      SoC {_format_stats(group['soc'], '%')}")
+        print(f"      Mileage {_format_stats(group['mileage'], ' km')}")
+
+    print("\nMileage distribution (km):")
+    for label, count in report['mileage_distribution']:
+        print(f"  {label:>13}: {count}")
+
+    overdue = report['maintenance_overdue']
+    print(f"\nOverdue for maintenance (last maintained more than {report['maintenance_interval_days']} days ago): "
+          f"{len(overdue)}")
+    for scooter in overdue[:20]:
+        print(f"  {scooter['last_maintenance_date']} - {scooter['brand']} {scooter['model']} "
+              f"(SN: {scooter['serial_number']})")
+    if len(overdue) > 20:
+        print(f"  ... and {len(overdue) - 20} more")
+    if report['maintenance_unknown']:
+        print(f"Scooters without a valid maintenance date: {report['maintenance_unknown']}")
+    input("\nPress Enter to return...")
+
+
 def ui_update_scooter(user, limited=False):
     display_header("Update Scooter Record")
     selected = _search_and_select_item(
-        search_prompt="Enter a brand, model, or serial to search for the scooter to update",
+        search_prompt="Enter a brand, model, or serial to search for the scooter to update (end with * to match the start only)",
         search_function=services.search_scooters,
         current_user=user,
         result_formatter=lambda r: {'display': f"{r['brand']} {r['model']} (SN: {r['serial_number']})",
@@ -693,7 +778,7 @@ def ui_update_scooter(user, limited=False):
 def ui_delete_scooter(user):
     display_header("Delete Scooter Record")
     selected = _search_and_select_item(
-        search_prompt="Enter brand, model, or serial number to search for the scooter to delete",
+        search_prompt="Enter brand, model, or serial number to search for the scooter to delete (end with * to match the start only)",
         search_function=services.search_scooters,
         current_user=user,
         result_formatter=lambda r: {'display': f"{r['brand']} {r['model']} (SN: {r['serial_number']})",
@@ -718,22 +803,90 @@ def ui_delete_scooter(user):
 
 
 def ui_view_system_logs(user):
-    logs = services.view_system_logs(user)
-    display.display_system_logs_paginated(logs)
+    first_page = services.view_system_logs(user)
+    display.display_system_logs_paginated(first_page,
+                                          lambda before: services.get_system_logs_page(user, before))
+
+
+def ui_view_archived_logs(user):
+    display_header("Archived System Logs")
+    print("Leave a date empty to not limit the range on that side.")
+    start_date = get_validated_input("From date (YYYY-MM-DD)", validators.is_valid_date, required=False)
+    end_date = get_validated_input("Until date (YYYY-MM-DD)", validators.is_valid_date, required=False)
+    logs = services.view_archived_logs(user, start_date, end_date)
+    display.display_system_logs_paginated(*display.paginate_list(logs))
+
+
+def ui_export_data(user):
+    display_header("Export Data")
+    table = get_validated_input(f"Table to export ({'/'.join(services.EXPORT_TABLES)})",
+                                lambda value: (value in services.EXPORT_TABLES, "Unknown table."))
+    file_format = get_validated_input(f"Format ({'/'.join(services.EXPORT_FORMATS)})",
+                                      lambda value: (value in services.EXPORT_FORMATS, "Unknown format."))
+    print("Columns: " + ", ".join(services.EXPORT_TABLES[table]))
+    columns = get_validated_input(
+        "Columns to export, comma separated (leave empty for all)",
+        lambda value: (all(column.strip() in services.EXPORT_TABLES[table] for column in value.split(',')),
+                       "Unknown column."),
+        required=False)
+    fields = [column.strip() for column in columns.split(',')] if columns else None
+
+    print("\nExporting...")
+    result = services.export_records(table, user, file_format=file_format, fields=fields)
+    if result:
+        file_path, count = result
+        print(f"Exported {count} records to {file_path}")
+    input("\nPress Enter to return to the menu...")
+
+
+def backup_status_line():
+    """One line about the running or last finished backup, for the backup menu; None when there is none."""
+    job = services.get_backup_job()
+    if job is None:
+        return None
+    if job.state == 'snapshot':
+        return f"Backup in progress: copying database ({job.progress():.0%})"
+    if job.state == 'storing':
+        return "Backup in progress: storing changed chunks"
+    if job.state == 'done':
+        return f"Last backup: {job.backup_file} ({job.new_chunks} of {job.total_chunks} chunks changed)"
+    return f"Last backup failed: {job.error}"
 
 
 def ui_create_backup(user):
     display_header("Create Database Backup")
+    job = services.get_backup_job()
+    if job is not None and job.is_running():
+        print("A backup is already being created.")
+        input("Press Enter to return to the menu...")
+        return
     print("This will create a secure, timestamped backup of the entire database.")
     confirm = get_input("Are you sure you want to proceed? (yes/no): ").lower()
     if confirm == 'yes':
-        print("\nCreating backup...")
-        services.create_backup(user)
+        codec = get_validated_input(
+            f"Compression ({'/'.join(services.backup.CODECS)}, leave empty for {services.backup.BACKUP_CODEC})",
+            lambda value: (value in services.backup.CODECS, "Unknown compression."), required=False)
+        if services.start_backup(user, codec=codec or None):
+            print("\nThe backup is being created in the background; its progress is shown in the backup menu.")
     else:
         print("\nBackup cancelled.")
     input("Press Enter to return to the menu...")
 
 
+def ui_show_backup_progress(user):
+    display_header("Backup Progress")
+    job = services.get_backup_job()
+    if job is None:
+        print("No backup has been started.")
+    else:
+        while job.is_running():
+            print(f"\r{backup_status_line():<70}", end="", flush=True)
+            job.wait(0.2)
+        services.record_backup_result()
+        print(f"\r{backup_status_line():<70}")
+    input("\nPress Enter to return to the menu...")
+
+
 def ui_restore_from_backup(user):
     display_header("Restore Database from Backup")
 
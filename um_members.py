@@ -81,6 +81,7 @@ class AuthenticationService:
                 is_suspicious=1
             )
             print(f"Error: Too many failed login attempts.")
+            self.da.flush_audit_log()
             sys.exit()
 
         print("Error: Invalid username or password.")
@@ -88,9 +89,11 @@ class AuthenticationService:
 
 class ConsoleMenu:
 
-    def __init__(self, title, subtitle="Please choose an option:"):
+    def __init__(self, title, subtitle="Please choose an option:", status=None):
         self.title = title
         self.subtitle = subtitle
+        # Optional function returning a line shown above the options each time the menu is drawn.
+        self.status = status
         self.menu_options = {}
 
     def add_option(self, key, description, function):
@@ -99,7 +102,12 @@ class ConsoleMenu:
 
     def display(self):
         while True:
+            # Background jobs only report back; their results are logged here, on the main thread.
+            services.record_backup_result()
             display_header(self.title)
+            status_line = self.status() if self.status else None
+            if status_line:
+                print(status_line + "\n")
             print(self.subtitle)
             print("-" * len(self.subtitle))
             for key, option in self.menu_options.items():
@@ -143,6 +151,8 @@ class UrbanMobilityApp:
                 main_menu.add_option('4', "Manage Traveller Accounts", self.traveller_management_menu)
                 main_menu.add_option('5', "Manage Service Engineer Accounts", self.service_engineer_management_menu)
                 main_menu.add_option('6', "Manage Scooter Fleet", self.scooter_management_menu)
+                main_menu.add_option('7', "View Archived System Logs", lambda: ui_forms.ui_view_archived_logs(self.current_user))
+                main_menu.add_option('8', "Export Data", lambda: ui_forms.ui_export_data(self.current_user))
             case 'systemadmin' | 'SystemAdmin':
                 main_menu.add_option('1', "Manage Traveller Accounts", self.traveller_management_menu)
                 main_menu.add_option('2', "Manage Service Engineer Accounts", self.service_engineer_management_menu)
@@ -151,10 +161,13 @@ class UrbanMobilityApp:
                 main_menu.add_option('5', "View System Logs", lambda: ui_forms.ui_view_system_logs(self.current_user))
                 main_menu.add_option('6', "Manage Backups", self.backup_management_menu)
                 main_menu.add_option('7', "Manage My Account", self.account_management_menu)
+                main_menu.add_option('8', "View Archived System Logs", lambda: ui_forms.ui_view_archived_logs(self.current_user))
+                main_menu.add_option('9', "Export Data", lambda: ui_forms.ui_export_data(self.current_user))
             case 'serviceengineer' | 'ServiceEngineer':
                 main_menu.add_option('1', "Search & View Scooter", lambda: ui_forms.ui_search_scooters(self.current_user))
                 main_menu.add_option('2', "Update Scooter Status", self.scooter_update_menu_limited)
                 main_menu.add_option('3', "Manage My Account", self.account_management_menu)
+                main_menu.add_option('4', "Find Scooters Near a Location", lambda: ui_forms.ui_find_nearby_scooters(self.current_user))
         main_menu.add_option('L', "Logout", self.logout)
         main_menu.add_option('Q', "Quit Application", self.quit)
         result = main_menu.display()
@@ -186,7 +199,9 @@ class UrbanMobilityApp:
 
     def logout(self):
         if self.current_user:
+            services.record_backup_result()
             self.da.add_log_entry(self.current_user.username, "LOGOUT", "User logged out.")
+            self.da.flush_audit_log()
             print(f"Logging out {self.current_user.username}...")
             self.current_user = None
             time.sleep(1)
@@ -196,6 +211,12 @@ class UrbanMobilityApp:
 
     def quit(self):
         print("Shutting down the system. Goodbye!")
+        job = services.get_backup_job()
+        if job is not None and job.is_running():
+            print("Waiting for the running backup to finish...")
+            job.wait()
+        services.record_backup_result()
+        self.da.flush_audit_log()
         self.is_running = False
         self.current_user = None
         return 'EXIT_MENU'
@@ -223,6 +244,7 @@ class UrbanMobilityApp:
         menu.add_option('2', "Search & View Traveller", lambda: ui_forms.ui_search_travellers(self.current_user))
         menu.add_option('3', "Update Traveller Record", lambda: ui_forms.ui_update_traveller(self.current_user))
         menu.add_option('4', "Delete Traveller Record", lambda: ui_forms.ui_delete_traveller(self.current_user))
+        menu.add_option('5', "Import Travellers from CSV", lambda: ui_forms.ui_import_travellers(self.current_user))
         menu.add_option('B', "Back to Main Menu", None)
         menu.display()
 
@@ -242,11 +264,13 @@ class UrbanMobilityApp:
         menu.add_option('2', "Search & View Scooter", lambda: ui_forms.ui_search_scooters(self.current_user))
         menu.add_option('3', "Update Scooter Record", lambda: ui_forms.ui_update_scooter(self.current_user))
         menu.add_option('4', "Delete Scooter Record", lambda: ui_forms.ui_delete_scooter(self.current_user))
+        menu.add_option('5', "Find Scooters Near a Location", lambda: ui_forms.ui_find_nearby_scooters(self.current_user))
+        menu.add_option('6', "View Fleet Report", lambda: ui_forms.ui_view_fleet_report(self.current_user))
         menu.add_option('B', "Back to Main Menu", None)
         menu.display()
 
     def backup_management_menu(self):
-        menu = ConsoleMenu("Backup Management")
+        menu = ConsoleMenu("Backup Management", status=ui_forms.backup_status_line)
         if self.current_user.role == 'superadmin':
             menu.add_option('1', "Create Database Backup", lambda: ui_forms.ui_create_backup(self.current_user))
             menu.add_option('2', "Restore from Backup (Direct)",
@@ -260,6 +284,7 @@ class UrbanMobilityApp:
             menu.add_option('2', "Restore from Backup (with Code)",
                             lambda: ui_forms.ui_restore_from_backup(self.current_user))
 
+        menu.add_option('P', "Show Backup Progress", lambda: ui_forms.ui_show_backup_progress(self.current_user))
         menu.add_option('B', "Back to Main Menu", None)
 
         result = menu.display()
@@ -281,6 +306,8 @@ if __name__ == "__main__":
     import database
 
     database.initialize_database()
+    data_access.DataAccess().backfill_blind_indexes()
+    data_access.DataAccess().archive_old_logs()
 
     app = UrbanMobilityApp()
     app.run()